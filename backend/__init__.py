@@ -28,13 +28,44 @@ def create_app():
     if not app.config["MONGO_DB_NAME"]:
         raise RuntimeError("MONGO_DB_NAME not set")
 
+    app.config["MONGO_MAX_POOL_SIZE"] = int(os.getenv("MONGO_MAX_POOL_SIZE", "10"))
+    app.config["MONGO_MIN_POOL_SIZE"] = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+    app.config["MONGO_MAX_IDLE_TIME_MS"] = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+    app.config["MONGO_WAIT_QUEUE_TIMEOUT_MS"] = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+    # Create the indexes in backend/infrastructure/mongodb/indexes.py at startup. Off by default:
+    # building an index on a large collection blocks boot, so deploys run
+    # `python -m backend.infrastructure.mongodb.indexes apply` instead.
+    app.config["MONGO_ENSURE_INDEXES"] = os.getenv("MONGO_ENSURE_INDEXES", "false").strip().lower() in ("1", "true", "yes")
+    app.config["MONGO_ENSURE_INDEXES_TIMEOUT_MS"] = int(os.getenv("MONGO_ENSURE_INDEXES_TIMEOUT_MS", "2000"))
+
+    # sync (default): each chat message is inserted on the request path.
+    # async: messages go through a bounded write-behind queue (faster replies,
+    # but a crash or SIGKILL loses what is still queued), so it is opt-in.
+    app.config["CHAT_PERSISTENCE_MODE"] = os.getenv("CHAT_PERSISTENCE_MODE", "sync").strip().lower()
+    app.config["CHAT_WRITE_QUEUE_SIZE"] = int(os.getenv("CHAT_WRITE_QUEUE_SIZE", "1000"))
+    app.config["CHAT_WRITE_BATCH_SIZE"] = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "100"))
+    app.config["CHAT_WRITE_FLUSH_MS"] = int(os.getenv("CHAT_WRITE_FLUSH_MS", "50"))
+    app.config["CHAT_WRITE_ENQUEUE_TIMEOUT_MS"] = int(os.getenv("CHAT_WRITE_ENQUEUE_TIMEOUT_MS", "500"))
+
+    # Where /analytics reads from: "rollups" (chatDailyRollups), "aggregate" ($facet over chatMessages)
+    # or "auto" (rollups once the compaction job has backfilled them, aggregate until then).
+    app.config["ANALYTICS_SOURCE"] = os.getenv("ANALYTICS_SOURCE", "auto").strip().lower()
+
     app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
         "pool_pre_ping": True,
         "pool_size": 2,
         "max_overflow": 0,
     }
 
+    app.config["CHATBOT_WARMUP"] = os.getenv("CHATBOT_WARMUP", "false").strip().lower() in ("1", "true", "yes")
+
     db.init_app(app)
+
+    from backend.infrastructure.mongodb import mongo_client
+    mongo_client.init_app(app)
+
+    from backend.application.ai.service_container import chatbot_services
+    chatbot_services.init_app(app)
     CORS(
         app,
         resources={
@@ -88,6 +119,10 @@ def create_app():
 
     @app.get("/health")
     def health():
-        return {"ok": True}
+        return {
+            "ok": True,
+            "mongo_pool": mongo_client.mongo_pool_stats(),
+            "chatbot": chatbot_services.stats(),
+        }
 
     return app
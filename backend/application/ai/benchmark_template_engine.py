@@ -0,0 +1,92 @@
+# Micro-benchmark of template rendering on the chat hot path: every in-code
+# industry template rendered against a full company profile, comparing the
+# compiled render plans with the previous regex-substitution renderer.
+#
+#   python -m backend.application.ai.benchmark_template_engine --rounds 2000
+
+import argparse
+import time
+
+from backend.application.ai.template_engine import VARIABLE_PATTERN, TemplateEngine, compile_template
+from backend.data_access.ai.template_repo import TemplateRepository
+
+COMPANY = {
+    "company_name": "Harbour Noodle House",
+    "industry": "restaurant",
+    "business_hours": "10am - 10pm",
+    "location": "1 Marina Blvd, Singapore",
+    "contact_email": "hello@harbournoodle.sg",
+    "contact_phone": "+65 6123 4567",
+    "website_url": "https://harbournoodle.sg",
+    "price_range": "$$",
+    "specialties": "Laksa, Char Kway Teow",
+    "cuisine_type": "Peranakan",
+    "restaurant_style": "casual",
+    "dining_options": "dine-in, takeaway",
+    "supports_reservations": "available",
+    "reservation_link": "https://harbournoodle.sg/book",
+    "seating_capacity": 80,
+}
+
+ENTITIES = [{"entity": "date", "value": "tomorrow"}, {"entity": "pax", "value": 4}]
+
+
+def legacy_render(template, company, entities):
+    # The renderer before compiled plans: one regex pass and a closure per render.
+    if not template:
+        return "Sorry, I don't have an answer for that yet."
+    if not company:
+        return template
+
+    def replace_var(match):
+        key = match.group(1)
+        if key in company and company[key] is not None:
+            return str(company[key])
+        for entity in entities:
+            if entity.get("entity") == key:
+                return str(entity.get("value"))
+        return f"<{key}>"
+
+    return VARIABLE_PATTERN.sub(replace_var, template)
+
+
+def _templates() -> list[str]:
+    return [t for by_intent in TemplateRepository.DEFAULT_TEMPLATES.values() for t in by_intent.values()]
+
+
+def _time(render, templates: list[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for t in templates:
+            render(t, COMPANY, ENTITIES)
+    return (time.perf_counter() - started) * 1e6 / (rounds * len(templates))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark template rendering (compiled plans vs regex substitution).")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    templates = _templates()
+    engine = TemplateEngine()
+
+    for t in templates:
+        assert engine.render(t, COMPANY, ENTITIES) == legacy_render(t, COMPANY, ENTITIES), t
+
+    compile_template.cache_clear()
+    started = time.perf_counter()
+    for t in templates:
+        compile_template(t)
+    compile_us = (time.perf_counter() - started) * 1e6 / len(templates)
+
+    legacy_us = _time(legacy_render, templates, args.rounds)
+    compiled_us = _time(engine.render, templates, args.rounds)
+
+    print(f"{len(templates)} templates x {args.rounds} rounds")
+    print(f"{'renderer':<10} {'us/render':>10}")
+    print(f"{'regex':<10} {legacy_us:>10.2f}")
+    print(f"{'compiled':<10} {compiled_us:>10.2f}  ({legacy_us / compiled_us:.1f}x, one-off compile {compile_us:.2f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 from typing import Any, Dict, List, Optional
 import re
 
+from backend.application.ai.stage_timer import StageTimer
+from backend.data_access.ai.bot_config_repo import BotConfig
+
 class ChatbotService:
     def __init__(
         self,
@@ -12,6 +15,9 @@ class ChatbotService:
         personality_repository=None,
         chat_message_service=None, 
         quick_reply_repository=None,
+        quick_reply_index=None,
+        reply_cache=None,
+        bot_config_repository=None,
     ):
         self.intent_service = intent_service
         self.company_repository = company_repository
@@ -21,6 +27,9 @@ class ChatbotService:
         self.personality_repository = personality_repository
         self.chat_message_service = chat_message_service
         self.quick_reply_repository = quick_reply_repository
+        self.quick_reply_index = quick_reply_index
+        self.reply_cache = reply_cache
+        self.bot_config_repository = bot_config_repository
 
     # CHAT
     def chat(
@@ -29,24 +38,32 @@ class ChatbotService:
         message: str,
         session_id: Optional[str] = None,
         user_id: Optional[int] = None,
+        bot_config: Optional[BotConfig] = None,
     ) -> Dict[str, Any]:
+        # Per-stage timings are saved on the bot message (metadata.timings).
+        timer = StageTimer()
+
+        # Clicked quick replies resolve by exact text; no need to run the intent model.
+        quick_reply_match = (
+            self.quick_reply_index.lookup(company_id, message)
+            if self.quick_reply_index
+            else None
+        )
+        if quick_reply_match:
+            intent_result = {"intent": quick_reply_match[0], "confidence": 1.0, "entities": [], "tier": "quick_reply"}
+        else:
+            intent_result = self.intent_service.parse(message)
 
-        intent_result = self.intent_service.parse(message)
         intent = intent_result.get("intent", "fallback")
         confidence = float(intent_result.get("confidence", 0.0))
         entities = intent_result.get("entities", [])
+        intent_tier = intent_result.get("tier")
+        timer.lap("intent")
 
         company = self.company_repository.get_company_profile(company_id)
 
-        chatbot = (
-            self.chatbot_repository.get_by_organisation_id(company_id)
-            if self.chatbot_repository
-            else None
-        )
-
-        personality = None
-        if chatbot and chatbot.personality_id and self.personality_repository:
-            personality = self.personality_repository.get_by_id(chatbot.personality_id)
+        chatbot = bot_config or self._bot_config_for(company_id)
+        timer.lap("profile")
 
         # Lightweight context retention: if the current message is ambiguous, try re-parsing with the
         # previous user message as context.
@@ -79,9 +96,11 @@ class ChatbotService:
                         intent = ctx_intent
                         confidence = ctx_conf
                         entities = ctx_result.get("entities", [])
+                        intent_tier = ctx_result.get("tier")
             except Exception:
                 # Never fail the chat call due to context logic.
                 pass
+            timer.lap("context")
 
         industry = (company or {}).get("industry", "default")
 
@@ -100,85 +119,33 @@ class ChatbotService:
 
         # Use detected language if confidence is high
         reply_language = detected_language if lang_conf >= 0.4 else "en"
+        timer.lap("language")
 
-        # Try detected language template
-        template = self.template_repository.get_template(
-            company_id=company_id,
-            industry=industry,
-            intent=intent,
-            language=reply_language,
-        )
-
-        # Fallback to English if missing
-        if not template:
-            reply_language = "en"
-            template = self.template_repository.get_template(
-                company_id=company_id,
-                industry=industry,
-                intent=intent,
-                language=reply_language,
-            )
-
-        reply = self.template_engine.render(
-            template=template,
-            company=company or {},
-            entities=entities,
+        reply, reply_language = self._reply_for(
+            company_id, company, chatbot, industry, intent, reply_language, entities, timer=timer
         )
 
-        used_custom_welcome = False
-
-        # Welcome override (e.g. user says "hi")
-        if (
-            chatbot
-            and intent in ("greet", "greeting")
-            and isinstance(chatbot.welcome_message, str)
-            and chatbot.welcome_message.strip()
-        ):
-            reply = self.template_engine.render(
-                template=chatbot.welcome_message,
-                company=company or {},
-                entities=entities,
-            )
-            used_custom_welcome = True
-
-        # If the org provided a custom greeting, use it "as written" (no personality wrapping).
-        if personality and not used_custom_welcome:
-            reply = self._apply_personality(reply, personality.name, reply_language, intent=intent)
-
-        # If the org provided a custom greeting, do not auto-add emojis; only strip if disallowed.
-        if chatbot and chatbot.allow_emojis is False:
-            reply = self._strip_emojis(reply)
-        elif chatbot and chatbot.allow_emojis is True and not used_custom_welcome:
-            reply = self._ensure_emoji(reply)
-
         quick_replies = self._quick_replies_for(company_id, industry, intent, reply_language)
+        timer.lap("quick_replies")
 
-        # Persist USER message
-        self._save_chat_message(
+        # Persist the USER message and BOT reply together (one insert, shared turn id)
+        self._save_chat_turn(
             organisation_id=company_id,
             chatbot_id=chatbot.bot_id if chatbot else None,
             session_id=session_id,
-            sender="user",
             sender_user_id=user_id,
-            message=message,
-            intent=intent,
-        )
-
-        # Persist BOT reply
-        self._save_chat_message(
-            organisation_id=company_id,
-            chatbot_id=chatbot.bot_id if chatbot else None,
-            session_id=session_id,
-            sender="bot",
-            sender_user_id=None,
-            message=reply,
+            user_message=message,
+            bot_message=reply,
             intent=intent,
+            confidence=confidence,
+            timings=timer.as_dict(),
         )
 
         return {
             "ok": True,
             "intent": intent,
             "confidence": confidence,
+            "intent_tier": intent_tier,
             "entities": entities,
             "reply": reply,
             "quick_replies": quick_replies,
@@ -192,89 +159,156 @@ class ChatbotService:
         self,
         company_id: str | int,
         session_id: Optional[str] = None,
+        bot_config: Optional[BotConfig] = None,
     ) -> Dict[str, Any]:
+        timer = StageTimer()
 
         company = self.company_repository.get_company_profile(company_id)
 
+        chatbot = bot_config or self._bot_config_for(company_id)
+        timer.lap("profile")
+
+        industry = (company or {}).get("industry", "default")
+
+        # Welcome is ALWAYS English
+        language = "en"
+
+        # Same reply as a "greet" turn in English, so it shares the reply cache.
+        reply, language = self._reply_for(company_id, company, chatbot, industry, "greet", language, [], timer=timer)
+
+        quick_replies = self._quick_replies_for(
+            company_id,
+            industry,
+            "greet",
+            language,  # English quick replies for welcome
+        )
+        timer.lap("quick_replies")
+
+        if chatbot and session_id:
+            self._save_chat_message(
+                organisation_id=company_id,
+                chatbot_id=chatbot.bot_id,
+                session_id=session_id,
+                sender="bot",
+                sender_user_id=None,
+                message=reply,
+                intent="greet",
+                timings=timer.as_dict(),
+            )
+
+        return {
+            "ok": True,
+            "intent": "greet",
+            "confidence": 1.0,
+            "entities": [],
+            "reply": reply,
+            "quick_replies": quick_replies,
+            "language": language,
+            "language_confidence": 1.0,
+        }
+
+    # HELPERS
+    def _org_id(self, company_id) -> int | None:
+        try:
+            return int(company_id) if company_id is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def _bot_config_for(self, company_id: str | int) -> Optional[BotConfig]:
+        """Chatbot + personality settings, from the joined read model when configured."""
+        if self.bot_config_repository:
+            return self.bot_config_repository.get_by_organisation_id(company_id)
+
         chatbot = (
             self.chatbot_repository.get_by_organisation_id(company_id)
             if self.chatbot_repository
             else None
         )
+        if not chatbot:
+            return None
 
         personality = None
-        if chatbot and chatbot.personality_id and self.personality_repository:
+        if chatbot.personality_id and self.personality_repository:
             personality = self.personality_repository.get_by_id(chatbot.personality_id)
+        return BotConfig.from_models(chatbot, personality)
 
-        industry = (company or {}).get("industry", "default")
-
-        # Welcome is ALWAYS English
-        language = "en"
-
-        template = self.template_repository.get_template(
+    def _reply_for(
+        self,
+        company_id: str | int,
+        company: Optional[Dict[str, Any]],
+        chatbot: Optional[BotConfig],
+        industry: str,
+        intent: str,
+        reply_language: str,
+        entities: List[Dict[str, Any]],
+        timer: Optional[StageTimer] = None,
+    ) -> tuple[str, str]:
+        """
+        Returns (reply, language actually used). Replies without entities
+        depend only on the org profile, chatbot settings and templates, so
+        they are served from the reply cache when one is configured.
+        `timer` gets "template" (lookup) and "render" laps.
+        """
+        cacheable = self.reply_cache is not None and company and not entities
+        org_id = self._org_id(company_id) if cacheable else None
+        if cacheable:
+            cached = self.reply_cache.get(org_id, intent, reply_language)
+            if cached:
+                if timer:
+                    timer.lap("template")
+                return cached
+
+        requested_language = reply_language
+
+        # Detected language template, falling back to English if missing (one query for both).
+        template, reply_language = self.template_repository.resolve_template(
             company_id=company_id,
             industry=industry,
-            intent="greet",
-            language=language,
+            intent=intent,
+            language=reply_language,
         )
+        if timer:
+            timer.lap("template")
 
         reply = self.template_engine.render(
             template=template,
             company=company or {},
-            entities=[],
+            entities=entities,
         )
 
-        # Use the org-configured greeting (welcome_message) as the very first message in a session.
-        # If it's empty/unset, fall back to the default greeting template above.
         used_custom_welcome = False
-        if chatbot and isinstance(chatbot.welcome_message, str) and chatbot.welcome_message.strip():
+
+        # Welcome override (e.g. user says "hi")
+        if (
+            chatbot
+            and intent in ("greet", "greeting")
+            and isinstance(chatbot.welcome_message, str)
+            and chatbot.welcome_message.strip()
+        ):
             reply = self.template_engine.render(
                 template=chatbot.welcome_message,
                 company=company or {},
-                entities=[],
+                entities=entities,
             )
             used_custom_welcome = True
 
-        # Apply personality using English language
         # If the org provided a custom greeting, use it "as written" (no personality wrapping).
-        if personality and not used_custom_welcome:
-            reply = self._apply_personality(reply, personality.name, language, intent="greet")
+        if chatbot and chatbot.personality_name and not used_custom_welcome:
+            reply = self._apply_personality(reply, chatbot.personality_name, reply_language, intent=intent)
 
-        # Emoji toggle
         # If the org provided a custom greeting, do not auto-add emojis; only strip if disallowed.
         if chatbot and chatbot.allow_emojis is False:
             reply = self._strip_emojis(reply)
         elif chatbot and chatbot.allow_emojis is True and not used_custom_welcome:
             reply = self._ensure_emoji(reply)
-            
-        if chatbot and session_id:
-            self._save_chat_message(
-                organisation_id=company_id,
-                chatbot_id=chatbot.bot_id,
-                session_id=session_id,
-                sender="bot",
-                sender_user_id=None,
-                message=reply,
-                intent="greet",
-            )
 
-        return {
-            "ok": True,
-            "intent": "greet",
-            "confidence": 1.0,
-            "entities": [],
-            "reply": reply,
-            "quick_replies": self._quick_replies_for(
-                company_id,
-                industry,
-                "greet",
-                language,  # English quick replies for welcome
-            ),
-            "language": language,
-            "language_confidence": 1.0,
-        }
+        if cacheable:
+            self.reply_cache.set(org_id, intent, requested_language, reply, reply_language)
+        if timer:
+            timer.lap("render")
+
+        return reply, reply_language
 
-    # HELPERS
     def _save_chat_message(
         self,
         organisation_id: str | int,
@@ -284,6 +318,7 @@ class ChatbotService:
         sender_user_id: Optional[int],
         message: str,
         intent: Optional[str],
+        timings: Optional[Dict[str, float]] = None,
     ) -> None:
         if not self.chat_message_service:
             return
@@ -299,6 +334,37 @@ class ChatbotService:
             sender_user_id=sender_user_id,
             message=message or "",
             intent=intent,
+            timings=timings,
+        )
+
+    def _save_chat_turn(
+        self,
+        organisation_id: str | int,
+        chatbot_id: Optional[int],
+        session_id: Optional[str],
+        sender_user_id: Optional[int],
+        user_message: str,
+        bot_message: str,
+        intent: Optional[str],
+        confidence: Optional[float] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> None:
+        if not self.chat_message_service:
+            return
+
+        if not chatbot_id or not session_id:
+            return
+
+        self.chat_message_service.save_turn(
+            organisation_id=int(organisation_id),
+            chatbot_id=chatbot_id,
+            session_id=session_id,
+            sender_user_id=sender_user_id,
+            user_message=user_message or "",
+            bot_message=bot_message or "",
+            intent=intent,
+            confidence=confidence,
+            timings=timings,
         )
 
     def _quick_replies_for(self, company_id: str | int, industry: str, intent: str, language: str) -> List[str]:
@@ -0,0 +1,74 @@
+import logging
+import os
+from pathlib import Path
+
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+BASE_DIR = Path(__file__).parent
+ONNX_DIR = Path(os.getenv("INTENT_ONNX_DIR", BASE_DIR / "models" / "onnx"))
+
+# torch | torch-int8 | onnx | onnx-int8
+ENCODER_BACKEND = os.getenv("INTENT_ENCODER_BACKEND", "torch").strip().lower()
+# Instruction-set target of the int8 ONNX export (avx2, avx512, avx512_vnni, arm64).
+ONNX_QUANTIZATION = os.getenv("INTENT_ONNX_QUANTIZATION", "avx2").strip().lower()
+
+ENCODER_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+
+def onnx_file_name(quantized: bool, quantization: str | None = None) -> str:
+    if quantized:
+        return f"onnx/model_qint8_{quantization or ONNX_QUANTIZATION}.onnx"
+    return "onnx/model.onnx"
+
+
+def _load_torch(quantized: bool) -> SentenceTransformer:
+    model = SentenceTransformer(MODEL_NAME, device="cpu")
+    if not quantized:
+        return model
+
+    import torch
+
+    # Dynamic int8 quantization of the Linear layers; weights shrink ~4x and
+    # matmuls use int8 kernels. Activations stay float.
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx(quantized: bool, quantization: str | None) -> SentenceTransformer:
+    file_name = onnx_file_name(quantized, quantization)
+    if not (ONNX_DIR / file_name).exists():
+        raise RuntimeError(
+            f"ONNX encoder not found at {ONNX_DIR / file_name}. "
+            "Run `python -m backend.application.ai.export_encoder` to export it."
+        )
+
+    try:
+        return SentenceTransformer(
+            str(ONNX_DIR),
+            device="cpu",
+            backend="onnx",
+            model_kwargs={"file_name": file_name},
+        )
+    except ImportError as e:
+        raise RuntimeError(
+            "The ONNX encoder backend needs `optimum[onnxruntime]` installed."
+        ) from e
+
+
+def load_encoder(backend: str | None = None, quantization: str | None = None) -> SentenceTransformer:
+    """
+    Loads the intent encoder for the configured backend. Every backend
+    returns a SentenceTransformer, so callers keep using `.encode(...)`.
+    """
+    backend = (backend or ENCODER_BACKEND).strip().lower()
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown INTENT_ENCODER_BACKEND {backend!r}; expected one of {ENCODER_BACKENDS}.")
+
+    logger.info("Loading intent encoder (%s backend)", backend)
+
+    if backend.startswith("onnx"):
+        return _load_onnx(quantized=backend == "onnx-int8", quantization=quantization)
+    return _load_torch(quantized=backend == "torch-int8")
@@ -0,0 +1,73 @@
+# Compares intent scoring strategies on the precomputed training embeddings.
+# No model is loaded: each held-out example's stored embedding is the query.
+#
+#   python -m backend.application.ai.evaluate_intent_index --folds 5 --k 2
+
+import argparse
+import time
+
+import numpy as np
+
+from backend.application.ai.intent_index import SCORING_STRATEGIES, IntentIndex
+from backend.application.ai.intent_service_embed import EMB_PATH, LBL_PATH
+
+
+def _folds(n: int, folds: int, seed: int) -> list[np.ndarray]:
+    order = np.random.default_rng(seed).permutation(n)
+    return np.array_split(order, folds)
+
+
+def evaluate(strategy: str, embeddings: np.ndarray, labels: np.ndarray, folds: int, k: int, seed: int) -> dict:
+    correct = 0
+    total = 0
+    scoring_seconds = 0.0
+    nbytes = 0
+
+    for test_idx in _folds(len(labels), folds, seed):
+        train_mask = np.ones(len(labels), dtype=bool)
+        train_mask[test_idx] = False
+
+        index = IntentIndex(embeddings[train_mask], labels[train_mask].tolist(), strategy=strategy, k=k)
+        nbytes = max(nbytes, index.nbytes)
+
+        started = time.perf_counter()
+        for i in test_idx:
+            predicted, _ = index.score(embeddings[i])
+            correct += predicted == labels[i]
+        scoring_seconds += time.perf_counter() - started
+        total += len(test_idx)
+
+    return {
+        "strategy": strategy,
+        "accuracy": correct / total,
+        "us_per_query": scoring_seconds * 1e6 / total,
+        "index_kib": nbytes / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate intent scoring strategies against brute force.")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--k", type=int, default=2, help="prototypes per intent (centroid/medoids) / examples aggregated (topk)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    embeddings = np.load(EMB_PATH).astype(np.float32)
+    labels = np.load(LBL_PATH)
+
+    print(f"{len(labels)} examples, {len(set(labels.tolist()))} intents, {args.folds}-fold cross-validation, k={args.k}\n")
+    print(f"{'strategy':<10} {'accuracy':>9} {'vs brute':>9} {'us/query':>9} {'index KiB':>10}")
+
+    baseline = None
+    for strategy in SCORING_STRATEGIES:
+        r = evaluate(strategy, embeddings, labels, args.folds, args.k, args.seed)
+        if baseline is None:
+            baseline = r["accuracy"]
+        print(
+            f"{r['strategy']:<10} {r['accuracy']:>9.2%} {r['accuracy'] - baseline:>+9.2%} "
+            f"{r['us_per_query']:>9.1f} {r['index_kib']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# Compares the tiered intent chain (exact -> keyword -> embedding) with
+# embedding-only detection, and sweeps the keyword tier threshold.
+# The keyword model is retrained per fold; the embedding tier uses each
+# held-out example's precomputed embedding as the query, so no encoder is loaded.
+#
+#   python -m backend.application.ai.evaluate_tiered_intents --folds 5
+
+import argparse
+
+import numpy as np
+
+from backend.application.ai.intent_cache import normalize_message
+from backend.application.ai.intent_index import IntentIndex
+from backend.application.ai.intent_model import build_pipeline, build_training_data
+from backend.application.ai.intent_service_embed import EMB_PATH, LBL_PATH
+from backend.application.ai.tiered_intent_service import build_exact_index
+
+THRESHOLDS = (0.3, 0.4, 0.45, 0.5, 0.55, 0.6, 0.7, 0.8, 0.9)
+
+# chatbot_service retries low-confidence results with conversation context
+# below this; a keyword answer must clear it, since probabilities there are
+# on a different scale from the embedding tier's cosine scores.
+CONTEXT_THRESHOLD = 0.45
+
+
+def _folds(n: int, folds: int, seed: int) -> list[np.ndarray]:
+    order = np.random.default_rng(seed).permutation(n)
+    return np.array_split(order, folds)
+
+
+def predict_folds(texts: list[str], embeddings: np.ndarray, labels: np.ndarray, folds: int, seed: int) -> dict:
+    """Per held-out example: the exact-tier intent (or None), keyword intent and probability, embedding intent."""
+    n = len(labels)
+    exact = np.empty(n, dtype=object)
+    keyword = np.empty(n, dtype=object)
+    keyword_conf = np.zeros(n)
+    embedding = np.empty(n, dtype=object)
+
+    for test_idx in _folds(n, folds, seed):
+        train_mask = np.ones(n, dtype=bool)
+        train_mask[test_idx] = False
+        train_idx = np.flatnonzero(train_mask)
+
+        examples: dict = {}
+        for i in train_idx:
+            examples.setdefault(labels[i], []).append(texts[i])
+        exact_index = build_exact_index(examples)
+
+        pipeline = build_pipeline()
+        pipeline.fit([texts[i] for i in train_idx], labels[train_mask])
+        probs = pipeline.predict_proba([texts[i] for i in test_idx])
+        classes = pipeline.classes_
+
+        index = IntentIndex(embeddings[train_mask], labels[train_mask].tolist(), strategy="brute")
+
+        for row, i in enumerate(test_idx):
+            exact[i] = exact_index.get(normalize_message(texts[i]))
+            keyword[i] = classes[probs[row].argmax()]
+            keyword_conf[i] = probs[row].max()
+            embedding[i], _ = index.score(embeddings[i])
+
+    return {"exact": exact, "keyword": keyword, "keyword_conf": keyword_conf, "embedding": embedding}
+
+
+def evaluate_threshold(threshold: float, predictions: dict, labels: np.ndarray) -> dict:
+    exact = predictions["exact"]
+    has_exact = np.array([e is not None for e in exact])
+    by_keyword = ~has_exact & (predictions["keyword_conf"] >= threshold)
+
+    tiered = np.where(has_exact, exact, np.where(by_keyword, predictions["keyword"], predictions["embedding"]))
+    keyword_correct = predictions["keyword"][by_keyword] == labels[by_keyword]
+    embedding_correct = predictions["embedding"][by_keyword] == labels[by_keyword]
+
+    return {
+        "threshold": threshold,
+        "accuracy": float(np.mean(tiered == labels)),
+        "keyword_share": float(by_keyword.mean()),
+        # On the messages the keyword tier answers: its precision vs what the embedding tier would have scored.
+        "keyword_precision": float(keyword_correct.mean()) if by_keyword.any() else float("nan"),
+        "embedding_on_same": float(embedding_correct.mean()) if by_keyword.any() else float("nan"),
+    }
+
+
+def calibrate(runs: list[list[dict]], embedding_accuracies: list[float]) -> float | None:
+    """
+    Lowest threshold at or above CONTEXT_THRESHOLD at which, in every run,
+    the tiered chain is no less accurate than embedding-only and the keyword
+    tier is no less precise than the embedding tier on the messages it takes
+    over. None if no threshold qualifies.
+    """
+    for i, threshold in enumerate(THRESHOLDS):
+        if threshold < CONTEXT_THRESHOLD:
+            continue
+        if all(
+            results[i]["accuracy"] >= accuracy
+            and not results[i]["keyword_precision"] < results[i]["embedding_on_same"]
+            for results, accuracy in zip(runs, embedding_accuracies)
+        ):
+            return threshold
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the tiered intent chain against embedding-only detection.")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3, help="cross-validation runs, one per seed")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    texts, text_labels = build_training_data()
+    embeddings = np.load(EMB_PATH).astype(np.float32)
+    labels = np.load(LBL_PATH).astype(object)
+    if text_labels != labels.tolist():
+        raise SystemExit("Intent embeddings are out of date; run precompute_intents.py first.")
+
+    runs = []
+    embedding_accuracies = []
+    for seed in range(args.seed, args.seed + args.repeats):
+        predictions = predict_folds(texts, embeddings, labels, args.folds, seed)
+        embedding_accuracies.append(float(np.mean(predictions["embedding"] == labels)))
+        runs.append([evaluate_threshold(t, predictions, labels) for t in THRESHOLDS])
+
+    embedding_accuracy = float(np.mean(embedding_accuracies))
+    print(
+        f"{len(labels)} examples, {len(set(text_labels))} intents, "
+        f"{args.folds}-fold cross-validation x {args.repeats} seeds\n"
+    )
+    print(f"embedding only: {embedding_accuracy:.2%}\n")
+    print(f"{'threshold':>9} {'accuracy':>9} {'vs embed':>9} {'worst':>7} {'keyword %':>10} {'kw prec':>8} {'embed same':>11}")
+
+    for i, threshold in enumerate(THRESHOLDS):
+        rows = [results[i] for results in runs]
+        deltas = [r["accuracy"] - a for r, a in zip(rows, embedding_accuracies)]
+        answered = [r for r in rows if r["keyword_share"]]
+        precision = np.mean([r["keyword_precision"] for r in answered]) if answered else float("nan")
+        embedding_same = np.mean([r["embedding_on_same"] for r in answered]) if answered else float("nan")
+        print(
+            f"{threshold:>9.2f} {np.mean([r['accuracy'] for r in rows]):>9.2%} {np.mean(deltas):>+9.2%} "
+            f"{min(deltas):>+7.2%} {np.mean([r['keyword_share'] for r in rows]):>10.1%} "
+            f"{precision:>8.2%} {embedding_same:>11.2%}"
+        )
+
+    threshold = calibrate(runs, embedding_accuracies)
+    if threshold is None:
+        print("\nNo threshold keeps the keyword tier at embedding accuracy; set INTENT_KEYWORD_TIER=false.")
+    else:
+        print(f"\nSuggested INTENT_KEYWORD_THRESHOLD={threshold:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Exports the intent encoder to ONNX (plain and int8) and checks parity against
+# intent_embeddings.npy. Run from the repo root:
+#
+#   python -m backend.application.ai.export_encoder            # export + check all backends
+#   python -m backend.application.ai.export_encoder --check-only --backend onnx-int8
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from backend.application.ai.encoders import (
+    ENCODER_BACKENDS,
+    MODEL_NAME,
+    ONNX_DIR,
+    ONNX_QUANTIZATION,
+    load_encoder,
+)
+from backend.application.ai.intent_service_embed import EMB_PATH, LBL_PATH
+from backend.application.ai.intent_training_data import INTENT_EXAMPLES
+
+
+def export_onnx(quantization: str = ONNX_QUANTIZATION) -> None:
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    print(f"Exporting {MODEL_NAME} to ONNX in {ONNX_DIR} ...")
+    model = SentenceTransformer(MODEL_NAME, device="cpu", backend="onnx")
+    model.save_pretrained(str(ONNX_DIR))
+
+    print(f"Quantizing ONNX model to int8 ({quantization}) ...")
+    export_dynamic_quantized_onnx_model(model, quantization, str(ONNX_DIR))
+
+
+def _training_texts() -> list[str]:
+    return [ex for examples in INTENT_EXAMPLES.values() for ex in examples]
+
+
+def check_parity(backend: str, min_cosine: float, quantization: str = ONNX_QUANTIZATION) -> bool:
+    """
+    Re-encodes the training examples with `backend` and compares them with the
+    precomputed embeddings (which come from the full-precision torch model):
+      - per-example cosine similarity to the stored vector
+      - nearest-neighbour intent agreement (leave-one-out) with the stored matrix
+    """
+    reference = np.load(EMB_PATH)
+    labels = np.load(LBL_PATH).tolist()
+    texts = _training_texts()
+
+    if len(texts) != len(reference):
+        print(f"[{backend}] training data changed since intent_embeddings.npy was built; rerun precompute_intents.py")
+        return False
+
+    encoder = load_encoder(backend, quantization)
+    started = time.perf_counter()
+    emb = encoder.encode(texts, normalize_embeddings=True, convert_to_numpy=True, batch_size=32)
+    elapsed_ms = (time.perf_counter() - started) * 1000 / len(texts)
+
+    cosine = np.sum(emb * reference, axis=1)
+
+    def nn_labels(queries: np.ndarray) -> list[str]:
+        sims = queries @ reference.T
+        np.fill_diagonal(sims, -np.inf)
+        return [labels[i] for i in np.argmax(sims, axis=1)]
+
+    agreement = np.mean([a == b for a, b in zip(nn_labels(emb), nn_labels(reference))])
+
+    ok = float(cosine.min()) >= min_cosine
+    print(
+        f"[{backend}] cosine mean={cosine.mean():.4f} min={cosine.min():.4f} | "
+        f"nn-intent agreement={agreement:.2%} | {elapsed_ms:.2f} ms/example | "
+        f"{'OK' if ok else 'FAIL'}"
+    )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the intent encoder to ONNX and check embedding parity.")
+    parser.add_argument("--check-only", action="store_true", help="skip the export, only run the parity check")
+    parser.add_argument("--backend", choices=ENCODER_BACKENDS, action="append", help="backend(s) to check (default: all)")
+    parser.add_argument("--quantization", default=ONNX_QUANTIZATION, help="ONNX int8 target: avx2, avx512, avx512_vnni, arm64")
+    parser.add_argument("--min-cosine", type=float, default=0.95, help="fail if any example drops below this cosine")
+    args = parser.parse_args()
+
+    if not args.check_only:
+        export_onnx(args.quantization)
+
+    results = [
+        check_parity(b, args.min_cosine, args.quantization)
+        for b in (args.backend or ENCODER_BACKENDS)
+    ]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
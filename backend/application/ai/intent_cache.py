@@ -0,0 +1,94 @@
+import os
+import re
+import time
+import threading
+import unicodedata
+from typing import Any, Callable, Dict, Optional
+
+from backend.infrastructure.cache.ttl_cache import TTLCache
+
+INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "2048"))
+INTENT_CACHE_TTL_SECONDS = float(os.getenv("INTENT_CACHE_TTL_SECONDS", "3600"))
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,!?;:'\"()[]。，！？；："
+
+
+def normalize_message(message: str) -> str:
+    """
+    Canonical form used as a cache / lookup key:
+    NFKC, case-folded, whitespace collapsed, surrounding punctuation removed.
+    "  Hours?? " and "hours" map to the same key.
+    """
+    text = unicodedata.normalize("NFKC", message or "")
+    text = _WHITESPACE.sub(" ", text.casefold())
+    return text.strip(_EDGE_PUNCTUATION)
+
+
+class CachedIntentService:
+    """
+    Wraps an intent service with a bounded LRU/TTL cache keyed by the
+    normalized message text.
+
+    `signature` returns a fingerprint of the data the wrapped service depends
+    on (e.g. the intent embedding files). It is checked at most every
+    `check_interval` seconds; when it changes the cache is cleared and
+    `on_change` is called so the service can reload its data.
+    """
+
+    def __init__(
+        self,
+        intent_service,
+        cache: Optional[TTLCache] = None,
+        signature: Optional[Callable[[], Any]] = None,
+        on_change: Optional[Callable[[], None]] = None,
+        check_interval: float = 5.0,
+    ):
+        self.intent_service = intent_service
+        self.cache = cache or TTLCache(maxsize=INTENT_CACHE_SIZE, ttl_seconds=INTENT_CACHE_TTL_SECONDS)
+        self._signature = signature
+        self._on_change = on_change
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._current_signature = signature() if signature else None
+
+    def _check_signature(self) -> None:
+        if not self._signature:
+            return
+
+        now = time.monotonic()
+        if now - self._last_check < self._check_interval:
+            return
+
+        with self._lock:
+            if now - self._last_check < self._check_interval:
+                return
+            self._last_check = now
+            signature = self._signature()
+            if signature == self._current_signature:
+                return
+            self._current_signature = signature
+            if self._on_change:
+                self._on_change()
+            self.cache.clear()
+
+    def parse(self, message: str) -> Dict[str, Any]:
+        key = normalize_message(message)
+        if not key:
+            return self.intent_service.parse(message)
+
+        self._check_signature()
+
+        result = self.cache.get(key)
+        if result is None:
+            result = self.intent_service.parse(message)
+            self.cache.set(key, result)
+        elif "tier" in result:
+            # Report hits as their own tier so tier counts reflect model work.
+            result = {**result, "tier": "cache"}
+
+        return {**result, "entities": list(result.get("entities", []))}
+
+    def stats(self) -> dict:
+        return self.cache.stats()
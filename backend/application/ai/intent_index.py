@@ -0,0 +1,131 @@
+import os
+from typing import Sequence
+
+import numpy as np
+
+# brute | centroid | medoids | topk
+INTENT_SCORING = os.getenv("INTENT_SCORING", "brute").strip().lower()
+# Prototypes per intent for "centroid"/"medoids", examples aggregated per intent for "topk".
+INTENT_SCORING_K = int(os.getenv("INTENT_SCORING_K", "2"))
+
+SCORING_STRATEGIES = ("brute", "centroid", "medoids", "topk")
+
+
+def _normalize_rows(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return m / norms
+
+
+def _cluster_prototypes(vectors: np.ndarray, k: int, medoids: bool, iterations: int = 10) -> np.ndarray:
+    """
+    Spherical k-means over one intent's examples. Seeds with the example
+    closest to the mean, then the examples least similar to those already
+    picked. With `medoids` each prototype is snapped to the cluster member
+    most similar to the rest of its cluster, so prototypes stay real examples.
+    """
+    if len(vectors) <= k:
+        return vectors
+
+    centroid = _normalize_rows(vectors.mean(axis=0, keepdims=True))[0]
+    chosen = [int(np.argmax(vectors @ centroid))]
+    best_sim = vectors @ vectors[chosen[0]]
+    while len(chosen) < k:
+        nxt = int(np.argmin(best_sim))
+        chosen.append(nxt)
+        best_sim = np.maximum(best_sim, vectors @ vectors[nxt])
+    protos = vectors[chosen]
+
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ protos.T, axis=1)
+        updated = protos.copy()
+        for j in range(k):
+            members = vectors[assignment == j]
+            if not len(members):
+                continue
+            if medoids:
+                updated[j] = members[int(np.argmax((members @ members.T).sum(axis=1)))]
+            else:
+                updated[j] = _normalize_rows(members.mean(axis=0, keepdims=True))[0]
+        if np.allclose(updated, protos):
+            break
+        protos = updated
+
+    return protos
+
+
+class IntentIndex:
+    """
+    Scores a normalized query embedding against the intent training data.
+
+    Strategies:
+      - brute:    cosine to every training example, best example wins (original behaviour)
+      - centroid: k spherical k-means centroids per intent (k=1 is the plain mean)
+      - medoids:  k medoid examples per intent
+      - topk:     mean of the k best example similarities per intent
+
+    centroid and medoids keep only a few vectors per intent, so scan cost and
+    memory stop growing with INTENT_EXAMPLES. Centroid similarities run lower
+    than nearest-example similarities, so confidence thresholds tuned for
+    brute force may need lowering.
+    """
+
+    def __init__(self, embeddings: np.ndarray, labels: Sequence[str], strategy: str = INTENT_SCORING, k: int = INTENT_SCORING_K):
+        if strategy not in SCORING_STRATEGIES:
+            raise ValueError(f"Unknown INTENT_SCORING {strategy!r}; expected one of {SCORING_STRATEGIES}.")
+
+        self.strategy = strategy
+        self.k = max(int(k), 1)
+        labels = list(labels)
+
+        if strategy == "brute":
+            self.vectors = embeddings
+            self.vector_labels = labels
+            return
+
+        intents = list(dict.fromkeys(labels))
+        label_arr = np.asarray(labels)
+
+        if strategy == "topk":
+            # Row indices per intent, padded to a rectangle; padding points at
+            # an extra -inf similarity slot appended at score time.
+            rows = [np.flatnonzero(label_arr == intent) for intent in intents]
+            width = max(len(r) for r in rows)
+            padded = np.full((len(intents), width), len(labels), dtype=np.int64)
+            for i, r in enumerate(rows):
+                padded[i, : len(r)] = r
+            self.vectors = embeddings
+            self.intents = intents
+            self._topk_rows = padded
+            self._topk_counts = np.array([len(r) for r in rows])
+            return
+
+        vectors, vector_labels = [], []
+        for intent in intents:
+            rows = np.asarray(embeddings[label_arr == intent], dtype=np.float32)
+            protos = _cluster_prototypes(rows, self.k, medoids=strategy == "medoids")
+            vectors.append(protos)
+            vector_labels.extend([intent] * len(protos))
+
+        self.vectors = np.ascontiguousarray(np.vstack(vectors), dtype=np.float32)
+        self.vector_labels = vector_labels
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.vectors.nbytes)
+
+    def score(self, query_emb: np.ndarray) -> tuple[str, float]:
+        sims = self.vectors @ query_emb
+
+        if self.strategy == "topk":
+            grouped = np.append(sims, -np.inf)[self._topk_rows]
+            k = min(self.k, grouped.shape[1])
+            top = np.partition(grouped, -k, axis=1)[:, -k:]
+            # Intents with fewer than k examples average only what they have.
+            top[np.isinf(top)] = 0.0
+            scores = top.sum(axis=1) / np.minimum(self._topk_counts, k)
+            best = int(np.argmax(scores))
+            return self.intents[best], float(scores[best])
+
+        best_idx = int(np.argmax(sims))
+        return self.vector_labels[best_idx], float(sims[best_idx])
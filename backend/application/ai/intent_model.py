@@ -23,6 +23,16 @@ def build_training_data() -> Tuple[List[str], List[str]]:
     return texts, labels
 
 
+def build_pipeline() -> Pipeline:
+    # TF-IDF + Logistic Regression pipeline
+    return Pipeline(
+        steps=[
+            ("tfidf", TfidfVectorizer(lowercase=True, ngram_range=(1, 2))),
+            ("clf", LogisticRegression(max_iter=1000)),
+        ]
+    )
+
+
 def train_intent_model():
     X, y = build_training_data()
 
@@ -31,13 +41,7 @@ def train_intent_model():
         X, y, test_size=0.2, random_state=42, stratify=y
     )
 
-    # TF-IDF + Logistic Regression pipeline
-    pipeline = Pipeline(
-        steps=[
-            ("tfidf", TfidfVectorizer(lowercase=True, ngram_range=(1, 2))),
-            ("clf", LogisticRegression(max_iter=1000)),
-        ]
-    )
+    pipeline = build_pipeline()
 
     pipeline.fit(X_train, y_train)
 
@@ -1,33 +1,191 @@
+import os
+import threading
+from concurrent.futures import Future
+
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from pathlib import Path
 
+from backend.application.ai.encoders import load_encoder
+from backend.application.ai.intent_index import IntentIndex
+
 BASE_DIR = Path(__file__).parent
 EMB_PATH = BASE_DIR / "intent_embeddings.npy"
 LBL_PATH = BASE_DIR / "intent_labels.npy"
 
+# Concurrent parse() calls within this window are encoded as one batch (0 disables batching).
+BATCH_WINDOW_MS = float(os.getenv("INTENT_BATCH_WINDOW_MS", "5"))
+MAX_BATCH_SIZE = int(os.getenv("INTENT_BATCH_MAX_SIZE", "16"))
+
 _model = None
-_intent_embeddings = None
-_intent_labels = None
+# (embeddings, labels), published together so readers never see half of a reload.
+_intent_data = None
+_intent_index = None
+_intent_lock = threading.RLock()
 
 
 def get_model():
+    """Returns the intent encoder for INTENT_ENCODER_BACKEND (torch, torch-int8, onnx, onnx-int8)."""
     global _model
     if _model is None:
-        _model = SentenceTransformer(
-            "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-        )
+        _model = load_encoder()
     return _model
 
 
 def get_intent_data():
-    global _intent_embeddings, _intent_labels
+    """
+    The embedding matrix is memory-mapped read-only, so every gunicorn worker
+    forked from a preloaded master shares the same physical pages.
+    """
+    global _intent_data
+
+    data = _intent_data
+    if data is None:
+        with _intent_lock:
+            if _intent_data is None:
+                intent_embeddings = np.load(EMB_PATH, mmap_mode="r")
+                intent_labels = np.load(LBL_PATH).tolist()
+                _intent_data = (intent_embeddings, intent_labels)
+            data = _intent_data
+
+    return data
+
+
+def get_intent_index() -> IntentIndex:
+    """Scoring index over the intent data, using the INTENT_SCORING strategy."""
+    global _intent_index
+    index = _intent_index
+    if index is None:
+        with _intent_lock:
+            if _intent_index is None:
+                intent_embeddings, intent_labels = get_intent_data()
+                _intent_index = IntentIndex(intent_embeddings, intent_labels)
+            index = _intent_index
+    return index
+
+
+def intent_data_signature() -> tuple:
+    """Fingerprint of the embedding files; changes whenever precompute_intents.py rewrites them."""
+    sig = []
+    for path in (EMB_PATH, LBL_PATH):
+        try:
+            st = path.stat()
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
+def reload_intent_data() -> None:
+    global _intent_data, _intent_index
+    with _intent_lock:
+        _intent_data = None
+        _intent_index = None
+
+
+def _encode(messages: list[str]) -> np.ndarray:
+    return get_model().encode(
+        messages,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        batch_size=max(len(messages), 1),
+    )
+
+
+class _EncodeRequest:
+    __slots__ = ("message", "future", "wake")
+
+    def __init__(self, message: str):
+        self.message = message
+        self.future: Future = Future()
+        # Set when the result is in, or when this request is made the leader.
+        self.wake = threading.Event()
+
+
+class _EncodeBatcher:
+    """
+    Coalesces concurrent encode requests into a single model call.
+
+    The oldest pending request leads: it encodes one batch (its own message
+    plus up to `max_batch_size - 1` queued behind it), hands each caller its
+    own row and passes the lead to the oldest request still pending, so no
+    caller works on other callers' batches after its own result is in. A
+    leader alone in the queue encodes straight away; with other requests
+    pending it waits up to `window_ms` for the batch to fill. There is no
+    background thread, so this is safe to create before gunicorn forks.
+    """
+
+    def __init__(self, window_ms: float, max_batch_size: int):
+        self.window_s = max(window_ms, 0.0) / 1000.0
+        self.max_batch_size = max(max_batch_size, 1)
+        self._lock = threading.Lock()
+        self._pending: list[_EncodeRequest] = []
+        self._batch_full = threading.Event()
+        self._leader_active = False
+
+    def encode(self, message: str) -> np.ndarray:
+        if self.window_s <= 0 or self.max_batch_size == 1:
+            return _encode([message])[0]
+
+        request = _EncodeRequest(message)
+        with self._lock:
+            self._pending.append(request)
+            if len(self._pending) >= self.max_batch_size:
+                self._batch_full.set()
+            is_leader = not self._leader_active
+            if is_leader:
+                self._leader_active = True
+
+        if not is_leader:
+            request.wake.wait()
+            if request.future.done():
+                return request.future.result()
+
+        self._lead()
+        return request.future.result()
+
+    def _lead(self) -> None:
+        # The leader is always _pending[0], so the batch taken below holds its request.
+        with self._lock:
+            others_pending = len(self._pending) > 1
+        if others_pending:
+            self._batch_full.wait(self.window_s)
+
+        with self._lock:
+            batch = self._pending[: self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            if len(self._pending) < self.max_batch_size:
+                self._batch_full.clear()
+
+        try:
+            embeddings = _encode([request.message for request in batch])
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+        else:
+            for request, emb in zip(batch, embeddings):
+                request.future.set_result(emb)
+        finally:
+            for request in batch:
+                request.wake.set()
+            with self._lock:
+                successor = self._pending[0] if self._pending else None
+                if successor is None:
+                    self._leader_active = False
+            if successor is not None:
+                successor.wake.set()
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
 
-    if _intent_embeddings is None:
-        _intent_embeddings = np.load(EMB_PATH)
-        _intent_labels = np.load(LBL_PATH).tolist()
 
-    return _intent_embeddings, _intent_labels
+def get_batcher() -> _EncodeBatcher:
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = _EncodeBatcher(BATCH_WINDOW_MS, MAX_BATCH_SIZE)
+    return _batcher
 
 
 class EmbeddingIntentService:
@@ -35,20 +193,14 @@ class EmbeddingIntentService:
         if not message or not message.strip():
             return {"intent": "fallback", "confidence": 0.0, "entities": []}
 
-        model = get_model()
-        intent_embeddings, intent_labels = get_intent_data()
+        index = get_intent_index()
 
-        query_emb = model.encode(
-            [message],
-            normalize_embeddings=True,
-            convert_to_numpy=True,
-        )[0]
+        query_emb = get_batcher().encode(message)
 
-        sims = intent_embeddings @ query_emb   # cleaner than np.dot
-        best_idx = int(np.argmax(sims))
+        intent, confidence = index.score(query_emb)
 
         return {
-            "intent": intent_labels[best_idx],
-            "confidence": float(sims[best_idx]),
+            "intent": intent,
+            "confidence": confidence,
             "entities": [],
-        }
\ No newline at end of file
+        }
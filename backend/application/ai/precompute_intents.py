@@ -1,11 +1,22 @@
 # file to be run everytime when the training data changes.
 
+import os
+
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from intent_training_data import INTENT_EXAMPLES
 
 MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 
+def save_atomic(path, array):
+    # Running workers memory-map these files; write a new file and swap it in
+    # instead of truncating the one they have mapped.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
 def main():
     print("Loading model...")
     model = SentenceTransformer(MODEL_NAME)
@@ -26,8 +37,8 @@ def main():
         batch_size=8,
     )
 
-    np.save("intent_embeddings.npy", embeddings)
-    np.save("intent_labels.npy", np.array(labels))
+    save_atomic("intent_embeddings.npy", np.ascontiguousarray(embeddings, dtype=np.float32))
+    save_atomic("intent_labels.npy", np.array(labels))
 
     print("Embeddings saved successfully.")
 
@@ -0,0 +1,110 @@
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from backend.application.ai.intent_cache import normalize_message
+from backend.data_access.ai.quick_reply_repo import GLOBAL_SCOPE, QUICK_REPLY_CACHE_SIZE, org_scope
+from backend.infrastructure.cache.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# normalized text -> (intent, language)
+IndexEntries = Dict[str, Tuple[str, str]]
+
+
+class QuickReplyIntentIndex:
+    """
+    Maps every configured quick-reply text to the intent it stands for, so a
+    clicked quick reply can be answered without running the intent model.
+
+    Global entries come from the in-code defaults and the rows with
+    organisation_id NULL; per-organisation entries come from that org's rows,
+    including custom texts, and are loaded on that org's first lookup. A row
+    is indexed when its intent is known (QuickReplyRepository.intent_for_row):
+    a text in QUICK_REPLY_INTENTS, or a row with its own intent.
+
+    With a CacheVersionWatcher the global entries are rebuilt when the
+    'quick_replies' version moves and each org's entries are keyed on its
+    'quick_replies:org:<id>' version, so edits made in another worker are
+    picked up within one poll. Without one, entries stay until rebuild_org().
+    """
+
+    def __init__(self, quick_reply_repository, cache_versions=None, cache_size: int = QUICK_REPLY_CACHE_SIZE):
+        self.quick_reply_repository = quick_reply_repository
+        self.cache_versions = cache_versions
+        self._lock = threading.Lock()
+        # (version key, entries), swapped as one so readers never mix builds.
+        self._global: Optional[Tuple[Any, IndexEntries]] = None
+        self._by_org = TTLCache(maxsize=cache_size)
+
+    def _version(self, scope: str):
+        return self.cache_versions.version(scope) if self.cache_versions is not None else None
+
+    def _entries_for_rows(self, rows) -> IndexEntries:
+        entries: IndexEntries = {}
+        for row in rows:
+            intent = self.quick_reply_repository.intent_for_row(row)
+            if intent:
+                entries[normalize_message(row.text)] = (intent, row.language)
+        return entries
+
+    def _load_global(self) -> IndexEntries:
+        repo = self.quick_reply_repository
+
+        entries: IndexEntries = {}
+        for language, texts in repo.DEFAULT_QUICK_REPLIES.items():
+            for text in texts:
+                intent = repo.intent_for_text(text, language)
+                if intent:
+                    entries[normalize_message(text)] = (intent, language)
+
+        entries.update(self._entries_for_rows(repo.get_all_rows(global_only=True)))
+        return entries
+
+    def _global_entries(self) -> IndexEntries:
+        version = self._version(GLOBAL_SCOPE)
+        current = self._global
+        if current is not None and current[0] == version:
+            return current[1]
+
+        with self._lock:
+            current = self._global
+            if current is None or current[0] != version:
+                current = (version, self._load_global())
+                self._global = current
+                logger.info("Quick-reply index built: %d global entries", len(current[1]))
+        return current[1]
+
+    def _org_entries(self, org_id: int) -> IndexEntries:
+        key = (org_id, self._version(org_scope(org_id)))
+        return self._by_org.get_or_load(
+            key,
+            lambda: self._entries_for_rows(self.quick_reply_repository.get_all_rows(organisation_id=org_id)),
+        )
+
+    def build(self) -> None:
+        """Loads the global entries now instead of on the first lookup."""
+        self._global_entries()
+
+    def rebuild_org(self, organisation_id: int) -> None:
+        org_id = int(organisation_id)
+        self._by_org.invalidate_where(lambda key: key[0] == org_id)
+        self._org_entries(org_id)
+
+    def lookup(self, company_id: str | int | None, message: str) -> Optional[Tuple[str, str]]:
+        """Returns (intent, language) for a known quick-reply text, else None."""
+        key = normalize_message(message)
+        if not key:
+            return None
+
+        try:
+            org_id = int(company_id) if company_id is not None else None
+        except (TypeError, ValueError):
+            org_id = None
+
+        if org_id is not None:
+            hit = self._org_entries(org_id).get(key)
+            if hit:
+                return hit
+
+        return self._global_entries().get(key)
@@ -0,0 +1,68 @@
+import os
+from typing import Optional, Tuple
+
+from backend.data_access.ai.bot_config_repo import PERSONALITIES_SCOPE
+from backend.data_access.ai.company_profile_repo import organisation_scope
+from backend.data_access.ai.template_catalog import GLOBAL_SCOPE as TEMPLATES_SCOPE
+from backend.data_access.ai.template_catalog import org_scope as template_org_scope
+from backend.infrastructure.cache.ttl_cache import TTLCache
+from backend.infrastructure.cache.versions import CacheVersionWatcher
+
+REPLY_CACHE_SIZE = int(os.getenv("REPLY_CACHE_SIZE", "4096"))
+# Safety net for edits that bypass the version triggers.
+REPLY_CACHE_TTL_SECONDS = float(os.getenv("REPLY_CACHE_TTL_SECONDS", "600"))
+
+
+class ReplyCache:
+    """
+    Fully post-processed replies (rendered template + personality + emoji
+    handling) per (organisation, intent, language).
+
+    For a given organisation profile and chatbot settings these replies are
+    the same for every user, so most turns can skip template resolution and
+    rendering. The key carries the versions of everything the reply is built
+    from: the organisation (profile + chatbot settings), personalities and
+    templates. Bumping any of them makes old entries unreachable; they age
+    out of the LRU.
+
+    Replies rendered with extracted entities are never cached.
+    """
+
+    def __init__(
+        self,
+        cache_versions: CacheVersionWatcher,
+        maxsize: int = REPLY_CACHE_SIZE,
+        ttl_seconds: float = REPLY_CACHE_TTL_SECONDS,
+    ):
+        self.cache_versions = cache_versions
+        self._cache = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    def _key(self, organisation_id: int, intent: str, language: str) -> tuple:
+        versions = self.cache_versions
+        return (
+            organisation_id,
+            intent,
+            language,
+            versions.version(organisation_scope(organisation_id)),
+            versions.version(PERSONALITIES_SCOPE),
+            versions.version(TEMPLATES_SCOPE),
+            versions.version(template_org_scope(organisation_id)),
+        )
+
+    def get(self, organisation_id: Optional[int], intent: str, language: str) -> Optional[Tuple[str, str]]:
+        """Returns (reply, reply language) or None."""
+        if organisation_id is None:
+            return None
+        return self._cache.get(self._key(organisation_id, intent, language))
+
+    def set(self, organisation_id: Optional[int], intent: str, language: str, reply: str, reply_language: str) -> None:
+        if organisation_id is None:
+            return
+        self._cache.set(self._key(organisation_id, intent, language), (reply, reply_language))
+
+    def invalidate_organisation(self, organisation_id: int) -> None:
+        """Drops this worker's replies for an organisation right away."""
+        self.cache_versions.note_bump(organisation_scope(organisation_id))
+
+    def stats(self) -> dict:
+        return self._cache.stats()
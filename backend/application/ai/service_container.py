@@ -0,0 +1,292 @@
+import atexit
+import logging
+import os
+import threading
+
+from flask import current_app
+
+from backend.application.ai.chatbot_service import ChatbotService
+from backend.application.ai.intent_cache import CachedIntentService
+from backend.application.ai.intent_service_embed import (
+    EmbeddingIntentService,
+    get_intent_index,
+    get_model,
+    intent_data_signature,
+    reload_intent_data,
+)
+from backend.application.ai.intent_service import IntentService
+from backend.application.ai.quick_reply_index import QuickReplyIntentIndex
+from backend.application.ai.reply_cache import ReplyCache
+from backend.application.ai.template_engine import TemplateEngine
+from backend.application.ai.tiered_intent_service import KEYWORD_TIER_ENABLED, TieredIntentService
+from backend.application.chat_service import ChatMessageService
+from backend.data_access.ai.bot_config_repo import BotConfigRepository
+from backend.data_access.ai.company_profile_repo import CompanyProfileRepository
+from backend.data_access.ai.chatbot_repo import ChatbotRepository
+from backend.data_access.ai.personality_repo import PersonalityRepository
+from backend.data_access.ai.template_catalog import TemplateCatalog
+from backend.data_access.ai.template_repo import TemplateRepository
+from backend.data_access.ai.cache_version_repo import CacheVersionRepository
+from backend.data_access.ai.quick_reply_repo import QuickReplyRepository
+from backend.data_access.ChatMessages.chatMessages import ChatMessageRepository
+from backend.data_access.ChatMessages.chatRollups import ChatRollupRepository
+from backend.infrastructure.cache.versions import CacheVersionWatcher
+from backend.infrastructure.mongodb.mongo_client import get_mongo_db
+from backend.infrastructure.mongodb.write_behind import BackgroundBatcher, WriteBehindWriter
+
+logger = logging.getLogger(__name__)
+
+
+class ChatbotServiceContainer:
+    """
+    Per-worker wiring point for the chatbot object graph.
+
+    Repositories, the template engine, the intent service and the Mongo-backed
+    message service are stateless between requests, so they are built once per
+    process and shared by every blueprint that serves chat. The message service
+    is created on first use because it needs the app config for the Mongo
+    client.
+
+    Lifecycle:
+      - init_app(app): attach to the app, optionally warm up the model
+      - warm_up():     load the encoder and intent embeddings eagerly; these
+                       are read-only module state, so a preloading gunicorn
+                       master shares them with its workers
+      - load_caches(): build this process's DB-backed quick-reply index and
+                       template catalog (gunicorn post_fork, per worker)
+      - shutdown():    flush queued chat messages and drop all shared objects
+                       (also registered with atexit)
+
+    The container remembers the pid that built it; after a fork (gunicorn
+    workers) the child rebuilds its own objects on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components = None
+        self._pid = None
+
+    # Lifecycle
+    def init_app(self, app):
+        app.extensions["chatbot_services"] = self
+        atexit.register(self.shutdown)
+
+        if app.config.get("CHATBOT_WARMUP"):
+            self.warm_up()
+
+    def warm_up(self) -> None:
+        # Components are per process and would be rebuilt after a fork, so
+        # only the model and embeddings are loaded here.
+        logger.info("Warming up intent model")
+        get_model()
+        get_intent_index()
+
+    def load_caches(self) -> None:
+        """Builds the quick-reply index and template catalog now instead of on first use."""
+        try:
+            self.quick_reply_index.build()
+        except Exception:
+            # The global entries load lazily on first lookup if the DB is not reachable yet.
+            logger.exception("Could not build quick-reply index at startup")
+        try:
+            self.template_catalog.load()
+        except Exception:
+            logger.exception("Could not load template catalog at startup")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            components = self._components if self._pid == os.getpid() else None
+            self._components = None
+            self._pid = None
+
+        # Write out chat messages and rollup updates still queued.
+        for name in ("chat_message_writer", "rollup_recorder"):
+            queued = (components or {}).get(name)
+            if queued is not None:
+                queued.close()
+
+    # Components
+    def _build_intent_service(self) -> CachedIntentService:
+        keyword_service = None
+        if KEYWORD_TIER_ENABLED:
+            try:
+                keyword_service = IntentService()
+            except Exception:
+                logger.warning("TF-IDF intent model unavailable; keyword tier disabled", exc_info=True)
+
+        return CachedIntentService(
+            TieredIntentService(EmbeddingIntentService(), keyword_service),
+            signature=intent_data_signature,
+            on_change=reload_intent_data,
+        )
+
+    def _build_components(self) -> dict:
+        cache_versions = CacheVersionWatcher(CacheVersionRepository().get_all)
+        quick_reply_repository = QuickReplyRepository(cache_versions=cache_versions)
+        template_catalog = TemplateCatalog(cache_versions)
+        return {
+            "intent_service": self._build_intent_service(),
+            "cache_versions": cache_versions,
+            "template_catalog": template_catalog,
+            "company_repository": CompanyProfileRepository(cache_versions=cache_versions),
+            "template_repository": TemplateRepository(catalog=template_catalog),
+            "template_engine": TemplateEngine(),
+            "reply_cache": ReplyCache(cache_versions),
+            "chatbot_repository": ChatbotRepository(),
+            "bot_config_repository": BotConfigRepository(cache_versions=cache_versions),
+            "personality_repository": PersonalityRepository(),
+            "quick_reply_repository": quick_reply_repository,
+            "quick_reply_index": QuickReplyIntentIndex(quick_reply_repository, cache_versions=cache_versions),
+        }
+
+    def _get_components(self) -> dict:
+        pid = os.getpid()
+        components = self._components
+        if components is not None and self._pid == pid:
+            return components
+
+        with self._lock:
+            if self._components is None or self._pid != pid:
+                self._components = self._build_components()
+                self._pid = pid
+            return self._components
+
+    @property
+    def chatbot_repository(self) -> ChatbotRepository:
+        return self._get_components()["chatbot_repository"]
+
+    @property
+    def bot_config_repository(self) -> BotConfigRepository:
+        return self._get_components()["bot_config_repository"]
+
+    @property
+    def company_repository(self) -> CompanyProfileRepository:
+        return self._get_components()["company_repository"]
+
+    @property
+    def quick_reply_repository(self) -> QuickReplyRepository:
+        return self._get_components()["quick_reply_repository"]
+
+    @property
+    def quick_reply_index(self) -> QuickReplyIntentIndex:
+        return self._get_components()["quick_reply_index"]
+
+    @property
+    def cache_versions(self) -> CacheVersionWatcher:
+        return self._get_components()["cache_versions"]
+
+    @property
+    def template_catalog(self) -> TemplateCatalog:
+        return self._get_components()["template_catalog"]
+
+    @property
+    def reply_cache(self) -> ReplyCache:
+        return self._get_components()["reply_cache"]
+
+    def invalidate_organisation(self, organisation_id: int) -> None:
+        """
+        Call after changing an organisation's profile or chatbot settings.
+        Other workers follow through the 'org:<id>' cache version.
+        """
+        if self._components is None or self._pid != os.getpid():
+            return
+        self.company_repository.invalidate(organisation_id)
+        self.bot_config_repository.invalidate(organisation_id)
+        self.reply_cache.invalidate_organisation(organisation_id)
+
+    @property
+    def intent_service(self) -> CachedIntentService:
+        return self._get_components()["intent_service"]
+
+    def stats(self) -> dict:
+        if self._components is None or self._pid != os.getpid():
+            return {}
+        stats = {
+            "intent_cache": self.intent_service.stats(),
+            "reply_cache": self.reply_cache.stats(),
+        }
+        for name in ("chat_message_writer", "rollup_recorder"):
+            queued = self._components.get(name)
+            if queued is not None:
+                stats[name] = queued.stats()
+        return stats
+
+    def _build_message_writer(self, repo: ChatMessageRepository, rollups: ChatRollupRepository) -> WriteBehindWriter | None:
+        config = current_app.config
+        mode = config.get("CHAT_PERSISTENCE_MODE", "sync")
+        if mode == "sync":
+            return None
+        if mode != "async":
+            logger.warning("Unknown CHAT_PERSISTENCE_MODE %r; using sync", mode)
+            return None
+
+        return WriteBehindWriter(
+            repo.collection,
+            max_queue=config.get("CHAT_WRITE_QUEUE_SIZE", 1000),
+            batch_size=config.get("CHAT_WRITE_BATCH_SIZE", 100),
+            flush_interval=config.get("CHAT_WRITE_FLUSH_MS", 50) / 1000,
+            enqueue_timeout=config.get("CHAT_WRITE_ENQUEUE_TIMEOUT_MS", 500) / 1000,
+            on_written=rollups.record,
+        )
+
+    def _build_rollup_recorder(self, rollups: ChatRollupRepository) -> BackgroundBatcher:
+        # Direct (sync) saves hand their documents over for rollups instead
+        # of updating them on the request path.
+        config = current_app.config
+        return BackgroundBatcher(
+            rollups.record,
+            thread_name="chat-rollups",
+            max_queue=config.get("CHAT_WRITE_QUEUE_SIZE", 1000),
+            batch_size=config.get("CHAT_WRITE_BATCH_SIZE", 100),
+            flush_interval=config.get("CHAT_WRITE_FLUSH_MS", 50) / 1000,
+            enqueue_timeout=config.get("CHAT_WRITE_ENQUEUE_TIMEOUT_MS", 500) / 1000,
+        )
+
+    def chat_message_service(self) -> ChatMessageService:
+        components = self._get_components()
+        service = components.get("chat_message_service")
+        if service is None:
+            with self._lock:
+                service = components.get("chat_message_service")
+                if service is None:
+                    db = get_mongo_db()
+                    repo = ChatMessageRepository(db)
+                    rollups = ChatRollupRepository(db)
+                    writer = self._build_message_writer(repo, rollups)
+                    recorder = self._build_rollup_recorder(rollups) if writer is None else None
+                    service = ChatMessageService(repo, writer=writer, rollup_recorder=recorder)
+                    components["chat_message_writer"] = writer
+                    components["rollup_recorder"] = recorder
+                    components["chat_message_service"] = service
+        return service
+
+    def chatbot_service(self) -> ChatbotService:
+        components = self._get_components()
+        service = components.get("chatbot_service")
+        if service is None:
+            chat_message_service = self.chat_message_service()
+            with self._lock:
+                service = components.get("chatbot_service")
+                if service is None:
+                    service = ChatbotService(
+                        intent_service=components["intent_service"],
+                        company_repository=components["company_repository"],
+                        template_repository=components["template_repository"],
+                        template_engine=components["template_engine"],
+                        chatbot_repository=components["chatbot_repository"],
+                        personality_repository=components["personality_repository"],
+                        chat_message_service=chat_message_service,
+                        quick_reply_repository=components["quick_reply_repository"],
+                        quick_reply_index=components["quick_reply_index"],
+                        reply_cache=components["reply_cache"],
+                        bot_config_repository=components["bot_config_repository"],
+                    )
+                    components["chatbot_service"] = service
+        return service
+
+
+chatbot_services = ChatbotServiceContainer()
+
+
+def get_chatbot_service() -> ChatbotService:
+    return chatbot_services.chatbot_service()
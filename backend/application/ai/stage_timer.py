@@ -0,0 +1,24 @@
+import time
+
+
+class StageTimer:
+    """
+    Wall-clock milliseconds per stage of one chat request.
+
+    lap(name) charges the time since the previous lap (or since the timer
+    was created) to `name`; as_dict() adds the running total.
+    """
+
+    def __init__(self):
+        self._started = self._last = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def as_dict(self) -> dict[str, float]:
+        timings = {name: round(ms, 3) for name, ms in self.stages.items()}
+        timings["total"] = round((time.perf_counter() - self._started) * 1000, 3)
+        return timings
@@ -1,5 +1,25 @@
+import os
 import re
-from typing import Dict, List, Any
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
+
+TEMPLATE_PLAN_CACHE_SIZE = int(os.getenv("TEMPLATE_PLAN_CACHE_SIZE", "4096"))
+
+VARIABLE_PATTERN = re.compile(r"\{\{\s*(.*?)\s*\}\}")
+
+
+@lru_cache(maxsize=TEMPLATE_PLAN_CACHE_SIZE)
+def compile_template(template: str) -> Tuple[str, ...]:
+    """
+    Compiles a template into its render plan: literal and slot segments
+    alternating, starting and ending with a literal (possibly empty).
+
+        "Open {{business_hours}} at {{location}}."
+        -> ("Open ", "business_hours", " at ", "location", ".")
+
+    Plans are cached by template text, so each distinct template is scanned once.
+    """
+    return tuple(VARIABLE_PATTERN.split(template))
 
 
 class TemplateEngine:
@@ -13,7 +33,7 @@ class TemplateEngine:
         { "business_hours": "10am–10pm", "location": "Singapore" }
     """
 
-    VARIABLE_PATTERN = re.compile(r"\{\{\s*(.*?)\s*\}\}")
+    VARIABLE_PATTERN = VARIABLE_PATTERN
 
     def render(self, template: str, company: Dict[str, Any], entities: List[Dict[str, Any]]):
         if not template:
@@ -22,19 +42,30 @@ class TemplateEngine:
         if not company:
             return template
 
-        def replace_var(match):
-            key = match.group(1)
+        plan = compile_template(template)
+        if len(plan) == 1:
+            return template
 
-            # Replace from company profile
-            if key in company and company[key] is not None:
-                return str(company[key])
+        # Entities indexed by name; the first entity with a name wins, as before.
+        entity_values: Dict[str, Any] = {}
+        for entity in entities or ():
+            entity_values.setdefault(entity.get("entity"), entity.get("value"))
 
-            # Replace from extracted entities (future use)
-            for entity in entities:
-                if entity.get("entity") == key:
-                    return str(entity.get("value"))
+        parts = [plan[0]]
+        for i in range(1, len(plan), 2):
+            key = plan[i]
 
+            # Replace from company profile
+            value = company.get(key)
+            if value is not None:
+                parts.append(str(value))
+            # Replace from extracted entities (future use)
+            elif key in entity_values:
+                parts.append(str(entity_values[key]))
             # Fallback if missing
-            return f"<{key}>"
+            else:
+                parts.append(f"<{key}>")
+
+            parts.append(plan[i + 1])
 
-        return self.VARIABLE_PATTERN.sub(replace_var, template)
\ No newline at end of file
+        return "".join(parts)
@@ -0,0 +1,92 @@
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from backend.application.ai.intent_cache import normalize_message
+from backend.application.ai.intent_training_data import INTENT_EXAMPLES
+
+logger = logging.getLogger(__name__)
+
+# The keyword tier's logistic-regression probabilities are not on the
+# embedding tier's cosine scale. The default threshold is calibrated by
+# `python -m backend.application.ai.evaluate_tiered_intents`: the lowest value
+# (not under chatbot_service's 0.45 context threshold) at which the keyword
+# tier is as precise as embeddings on what it answers. Re-run it after
+# retraining; set INTENT_KEYWORD_TIER=false if it finds no safe threshold.
+KEYWORD_TIER_ENABLED = os.getenv("INTENT_KEYWORD_TIER", "true").strip().lower() in ("1", "true", "yes")
+
+# Minimum confidence for each tier to answer; below it the next tier is tried.
+KEYWORD_TIER_THRESHOLD = float(os.getenv("INTENT_KEYWORD_THRESHOLD", "0.45"))
+EMBEDDING_TIER_THRESHOLD = float(os.getenv("INTENT_EMBEDDING_THRESHOLD", "0.0"))
+
+
+def build_exact_index(examples: dict) -> Dict[str, str]:
+    """
+    Normalized training example -> intent. Examples that normalize to the
+    same text under different intents are dropped, since an exact match
+    would be ambiguous.
+    """
+    index: Dict[str, str] = {}
+    ambiguous = set()
+
+    for intent, texts in examples.items():
+        for text in texts:
+            key = normalize_message(text)
+            if not key or key in ambiguous:
+                continue
+            if key in index and index[key] != intent:
+                ambiguous.add(key)
+                del index[key]
+                continue
+            index[key] = intent
+
+    return index
+
+
+class TieredIntentService:
+    """
+    Cheapest-first intent detection:
+
+      1. exact     - normalized message equals a training example
+      2. keyword   - TF-IDF + logistic regression (IntentService), if its
+                     confidence reaches `keyword_threshold`
+      3. embedding - sentence-transformer similarity (EmbeddingIntentService)
+
+    Every result carries a "tier" key naming the tier that answered.
+    """
+
+    def __init__(
+        self,
+        embedding_service,
+        keyword_service=None,
+        examples: Optional[dict] = None,
+        keyword_threshold: float = KEYWORD_TIER_THRESHOLD,
+        embedding_threshold: float = EMBEDDING_TIER_THRESHOLD,
+    ):
+        self.embedding_service = embedding_service
+        self.keyword_service = keyword_service
+        self.keyword_threshold = keyword_threshold
+        self.embedding_threshold = embedding_threshold
+        self.exact_index = build_exact_index(examples if examples is not None else INTENT_EXAMPLES)
+
+    def parse(self, message: str) -> Dict[str, Any]:
+        if not message or not message.strip():
+            return {"intent": "fallback", "confidence": 0.0, "entities": [], "tier": "exact"}
+
+        intent = self.exact_index.get(normalize_message(message))
+        if intent:
+            return {"intent": intent, "confidence": 1.0, "entities": [], "tier": "exact"}
+
+        if self.keyword_service is not None:
+            try:
+                result = self.keyword_service.parse(message)
+            except Exception:
+                logger.exception("Keyword intent tier failed; falling through to embeddings")
+            else:
+                if float(result.get("confidence", 0.0)) >= self.keyword_threshold:
+                    return {**result, "tier": "keyword"}
+
+        result = self.embedding_service.parse(message)
+        if float(result.get("confidence", 0.0)) < self.embedding_threshold:
+            return {**result, "intent": "fallback", "tier": "embedding"}
+        return {**result, "tier": "embedding"}
@@ -0,0 +1,340 @@
+# Chatbot analytics, answered from one of two sources (ANALYTICS_SOURCE):
+#
+#   rollups    per-day documents in chatDailyRollups
+#   aggregate  one $facet aggregation over chatMessages, bucketed in Mongo
+#   auto       rollups for ranges the rollups fully cover, aggregate
+#              otherwise (default)
+#
+# Rollups are updated as chat messages are written, so history from before
+# the deploy is only in them once backfilled. The compaction job rebuilds
+# closed days from chatMessages and writes the `analytics` table; run it
+# daily (e.g. from cron) and once, after deploying, with a range from the
+# first chat message up to today to backfill history:
+#
+#   python -m backend.application.analytics_service compact
+#   python -m backend.application.analytics_service compact --from 2026-01-01 --to 2026-10-17
+
+import argparse
+import json
+import logging
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+
+from backend.data_access.ChatMessages.chatRollups import ChatRollupRepository, day_key
+from backend.infrastructure.mongodb.mongo_client import get_mongo_db
+from backend.infrastructure.sketches.hyperloglog import HyperLogLog
+from backend.infrastructure.sketches.latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+SOURCES = ("auto", "rollups", "aggregate")
+
+# Intents kept in analytics.top_intents per bot and day.
+TOP_INTENTS_STORED = 5
+
+# Reply latency percentiles reported per bot and day.
+PERCENTILES = (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+
+# senderUserId values the endpoints treat as "not signed in".
+_ANONYMOUS = [None, 0, "", False]
+
+
+def _hour_label(hour: int | None) -> str | None:
+    return None if hour is None else datetime.strptime(str(hour), "%H").strftime("%I %p")
+
+
+def _peak_hour(hourly_counts: dict[int, int]) -> int | None:
+    return max(sorted(hourly_counts), key=hourly_counts.get) if hourly_counts else None
+
+
+def _top_intents(intent_counts: dict[str, int], k: int) -> list[tuple[str, int]]:
+    return sorted(intent_counts.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+def _latency_stats(histogram: LatencyHistogram, total_ms: float) -> dict:
+    samples = histogram.total
+    stats = {"samples": samples, "avg_ms": round(total_ms / samples, 3) if samples else None}
+    for name, q in PERCENTILES:
+        stats[f"{name}_ms"] = histogram.quantile(q)
+    return stats
+
+
+class ChatAnalyticsService:
+    """
+    Service for chatbot usage analytics (daily chats, unique users, busiest hour).
+    """
+
+    def __init__(self, rollups: ChatRollupRepository, messages=None, source: str = "rollups"):
+        if source not in SOURCES:
+            raise ValueError(f"Unknown analytics source {source!r}")
+        if source != "rollups" and messages is None:
+            raise ValueError(f"The {source} source needs the chatMessages collection")
+        self.rollups = rollups
+        self.messages = messages
+        self.source = source
+
+    def rollups_from(self) -> date | None:
+        """First day answered from the rollups; None when they are not used."""
+        if self.source == "aggregate":
+            return None
+        if self.source == "rollups":
+            return date.min
+        return self.rollups.complete_from()
+
+    def chatbot_summary(self, organisation_id: int, day_from: date, day_to: date) -> dict:
+        rollups_from = self.rollups_from()
+        if rollups_from is not None and day_from >= rollups_from:
+            counts = self._counts_from_rollups(organisation_id, day_from, day_to)
+        else:
+            counts = self._counts_from_messages(organisation_id, day_from, day_to)
+        return self._summary(day_from, day_to, *counts)
+
+    def _counts_from_rollups(self, organisation_id: int, day_from: date, day_to: date):
+        daily_counts: dict[str, int] = {}
+        hourly_counts: dict[int, int] = {}
+        unique_users = HyperLogLog()
+        unique_sessions = HyperLogLog()
+
+        fields = ["day", "count", "hours", "usersHll", "sessionsHll"]
+        for doc in self.rollups.find_range(organisation_id, day_from, day_to, fields=fields):
+            daily_counts[doc["day"]] = daily_counts.get(doc["day"], 0) + doc.get("count", 0)
+            for hour, count in (doc.get("hours") or {}).items():
+                hourly_counts[int(hour)] = hourly_counts.get(int(hour), 0) + count
+            unique_users.merge(HyperLogLog.from_sparse(doc.get("usersHll")))
+            unique_sessions.merge(HyperLogLog.from_sparse(doc.get("sessionsHll")))
+
+        visitors = unique_sessions if unique_users.is_empty() else unique_users
+        return daily_counts, hourly_counts, visitors.count(), visitors.relative_error
+
+    def _counts_from_messages(self, organisation_id: int, day_from: date, day_to: date):
+        # Buckets and distinct counts are computed server side; only a few
+        # dozen small documents come back, however many messages match.
+        pipeline = [
+            {"$match": {
+                "organisationId": organisation_id,
+                "sender": "user",
+                "timestamp": {
+                    "$gte": datetime.combine(day_from, datetime.min.time()),
+                    "$lt": datetime.combine(day_to + timedelta(days=1), datetime.min.time()),
+                },
+            }},
+            {"$facet": {
+                "daily": [
+                    {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}}, "count": {"$sum": 1}}},
+                ],
+                "hourly": [
+                    {"$group": {"_id": {"$hour": "$timestamp"}, "count": {"$sum": 1}}},
+                ],
+                "users": [
+                    {"$match": {"senderUserId": {"$nin": _ANONYMOUS}}},
+                    {"$group": {"_id": "$senderUserId"}},
+                    {"$count": "count"},
+                ],
+                "sessions": [
+                    {"$match": {"senderUserId": {"$in": _ANONYMOUS}, "sessionId": {"$nin": [None, ""]}}},
+                    {"$group": {"_id": "$sessionId"}},
+                    {"$count": "count"},
+                ],
+            }},
+        ]
+        result = next(self.messages.aggregate(pipeline, allowDiskUse=True), None) or {}
+
+        daily_counts = {row["_id"]: row["count"] for row in result.get("daily", [])}
+        hourly_counts = {row["_id"]: row["count"] for row in result.get("hourly", [])}
+        users = result.get("users") or [{"count": 0}]
+        sessions = result.get("sessions") or [{"count": 0}]
+        return daily_counts, hourly_counts, users[0]["count"] or sessions[0]["count"], 0.0
+
+    @staticmethod
+    def _summary(
+        day_from: date,
+        day_to: date,
+        daily_counts: dict[str, int],
+        hourly_counts: dict[int, int],
+        unique_users: int,
+        unique_users_error: float,
+    ) -> dict:
+        daily_list = []
+        cursor = day_from
+        while cursor <= day_to:
+            daily_list.append({
+                "date": cursor.strftime("%d-%m-%Y"),
+                "day": cursor.strftime("%A"),
+                "count": daily_counts.get(day_key(cursor), 0),
+            })
+            cursor += timedelta(days=1)
+
+        most_active_hour = _peak_hour(hourly_counts)
+
+        return {
+            "daily_chats": daily_list,
+            "total_chats": sum(daily_counts.values()),
+            "unique_users": unique_users,
+            # Relative standard error of unique_users: 0 when exact, ~0.016 from rollup sketches.
+            "unique_users_error": round(unique_users_error, 4),
+            "most_active_hour": {
+                "hour_24": most_active_hour,
+                "label": _hour_label(most_active_hour),
+                "count": hourly_counts.get(most_active_hour, 0) if most_active_hour is not None else 0,
+            },
+        }
+
+    def intent_summary(self, organisation_id: int, day_from: date, day_to: date, top_k: int = 10) -> dict:
+        """Intent mix, fallback rate and mean classifier confidence of user messages, from the rollups."""
+        intent_counts: dict[str, int] = {}
+        total = fallbacks = confidence_count = 0
+        confidence_sum = 0.0
+
+        fields = ["count", "intents", "fallbacks", "confidenceSum", "confidenceCount"]
+        for doc in self.rollups.find_range(organisation_id, day_from, day_to, fields=fields):
+            total += doc.get("count", 0)
+            fallbacks += doc.get("fallbacks", 0)
+            confidence_sum += doc.get("confidenceSum", 0.0)
+            confidence_count += doc.get("confidenceCount", 0)
+            for intent, count in (doc.get("intents") or {}).items():
+                intent_counts[intent] = intent_counts.get(intent, 0) + count
+
+        top = _top_intents(intent_counts, top_k)
+
+        return {
+            "total_messages": total,
+            "distinct_intents": len(intent_counts),
+            "fallback_count": fallbacks,
+            "fallback_rate": round(fallbacks / total, 4) if total else 0.0,
+            # Messages saved before confidence was recorded are not in the average.
+            "avg_confidence": round(confidence_sum / confidence_count, 4) if confidence_count else None,
+            "confidence_samples": confidence_count,
+            "top_intents": [
+                {"intent": intent, "count": count, "share": round(count / total, 4) if total else 0.0}
+                for intent, count in top
+            ],
+            "other_count": total - sum(count for _, count in top),
+        }
+
+    def latency_summary(self, organisation_id: int, day_from: date, day_to: date) -> dict:
+        """
+        Bot reply latency from the rollups: p50/p95/p99 of the total per bot
+        and day, and per stage over the whole range. Percentiles come from
+        10% log buckets (never under, at most 10% over the true value).
+        """
+        daily = []
+        stages: dict[str, LatencyHistogram] = {}
+        stage_sums: dict[str, float] = {}
+
+        fields = ["day", "chatbotId", "latency", "latencySum"]
+        docs = self.rollups.find_range(organisation_id, day_from, day_to, fields=fields)
+        for doc in sorted(docs, key=lambda d: (d["day"], d.get("chatbotId") or 0)):
+            latency = doc.get("latency") or {}
+            sums = doc.get("latencySum") or {}
+            for stage, counts in latency.items():
+                histogram = LatencyHistogram.from_sparse(counts)
+                stages.setdefault(stage, LatencyHistogram()).merge(histogram)
+                stage_sums[stage] = stage_sums.get(stage, 0.0) + sums.get(stage, 0.0)
+            if "total" in latency:
+                daily.append({
+                    "date": doc["day"],
+                    "chatbot_id": doc.get("chatbotId"),
+                    **_latency_stats(LatencyHistogram.from_sparse(latency["total"]), sums.get("total", 0.0)),
+                })
+
+        return {
+            "relative_error": LatencyHistogram.relative_error,
+            "daily": daily,
+            "stages": {
+                stage: _latency_stats(histogram, stage_sums[stage])
+                for stage, histogram in sorted(stages.items())
+            },
+        }
+
+    def compact(self, day_from: date, day_to: date, organisation_id: int | None = None) -> int:
+        """
+        Rebuilds the rollups of [day_from, day_to] from chatMessages and
+        upserts one `analytics` row per bot and day (total_messages, peak_hour,
+        top_intents as JSON, avg_response_time in ms). Returns the rows written.
+        """
+        from backend import db
+        from backend.models import Analytics, Chatbot
+
+        docs = self.rollups.rebuild(day_from, day_to, organisation_id)
+
+        # Messages can outlive their bot; analytics.bot_id is a foreign key.
+        bot_ids = {doc["chatbotId"] for doc in docs if doc.get("chatbotId") is not None}
+        known = {
+            bot_id for (bot_id,) in
+            db.session.query(Chatbot.bot_id).filter(Chatbot.bot_id.in_(bot_ids)).all()
+        } if bot_ids else set()
+
+        existing = {
+            (row.bot_id, row.date): row
+            for row in Analytics.query.filter(
+                Analytics.bot_id.in_(known),
+                Analytics.date >= day_from,
+                Analytics.date <= day_to,
+            ).all()
+        } if known else {}
+
+        written = 0
+        for doc in docs:
+            if doc.get("chatbotId") not in known:
+                continue
+            day = doc["date"].date()
+            row = existing.get((doc["chatbotId"], day))
+            if row is None:
+                row = Analytics(bot_id=doc["chatbotId"], date=day)
+                db.session.add(row)
+            row.total_messages = doc["count"]
+            row.peak_hour = _peak_hour({int(h): c for h, c in doc["hours"].items()})
+            total = (doc.get("latency") or {}).get("total")
+            if total:
+                row.avg_response_time = doc["latencySum"]["total"] / LatencyHistogram.from_sparse(total).total
+            row.top_intents = json.dumps([
+                {"intent": intent, "count": count}
+                for intent, count in _top_intents(doc["intents"], TOP_INTENTS_STORED)
+            ])
+            written += 1
+
+        db.session.commit()
+        logger.info("Compacted analytics for %s..%s: %d rollup(s), %d row(s)", day_from, day_to, len(docs), written)
+        return written
+
+
+def get_analytics_service() -> ChatAnalyticsService:
+    """The analytics service for the current app, reading from its ANALYTICS_SOURCE."""
+    source = current_app.config.get("ANALYTICS_SOURCE", "auto")
+    if source not in SOURCES:
+        logger.warning("Unknown ANALYTICS_SOURCE %r; using auto", source)
+        source = "auto"
+
+    db = get_mongo_db()
+    return ChatAnalyticsService(ChatRollupRepository(db), messages=db.chatMessages, source=source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild chat analytics rollups and the analytics table.")
+    parser.add_argument("command", choices=("compact",))
+    parser.add_argument("--from", dest="day_from", help="first day, YYYY-MM-DD (default: yesterday)")
+    parser.add_argument("--to", dest="day_to", help="last day, YYYY-MM-DD (default: --from)")
+    parser.add_argument("--organisation-id", type=int)
+    args = parser.parse_args()
+
+    try:
+        yesterday = datetime.utcnow().date() - timedelta(days=1)
+        day_from = datetime.strptime(args.day_from, "%Y-%m-%d").date() if args.day_from else yesterday
+        day_to = datetime.strptime(args.day_to, "%Y-%m-%d").date() if args.day_to else day_from
+    except ValueError:
+        parser.error("--from/--to must be YYYY-MM-DD")
+    if day_to < day_from:
+        parser.error("--to is before --from")
+
+    from backend import create_app
+
+    app = create_app()
+    with app.app_context():
+        service = ChatAnalyticsService(ChatRollupRepository(get_mongo_db()))
+        written = service.compact(day_from, day_to, args.organisation_id)
+    print(f"{written} analytics row(s) written for {day_from}..{day_to}")
+
+
+if __name__ == "__main__":
+    main()
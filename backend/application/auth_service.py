@@ -17,6 +17,7 @@ from backend.models import (
     OrgRolePermission,
 )
 from backend.application.notification_service import NotificationService
+from backend.application.ai.service_container import chatbot_services
 from backend.data_access.Notifications.notifications import NotificationRepository
 from backend.data_access.Users.users import UserRepository
 
@@ -377,6 +378,7 @@ def update_org_profile(payload: dict) -> dict:
             retail.promotions_note = payload.get("promotions_note")
 
     db.session.commit()
+    chatbot_services.invalidate_organisation(org.organisation_id)
     # Build response with subtype fields
     restaurant = OrganisationRestaurant.query.get(org.organisation_id)
     education = OrganisationEducation.query.get(org.organisation_id)
@@ -0,0 +1,133 @@
+# Benchmark of the chatbot analytics sources on a synthetic busy tenant:
+# the previous Python loop over every matching message, the $facet
+# aggregation, and the per-day rollups. Needs a MongoDB server; it seeds and
+# then drops a scratch database.
+#
+#   python -m backend.application.benchmark_analytics --uri mongodb://localhost:27017 --messages 1000000
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from pymongo import MongoClient
+
+from backend.application.analytics_service import ChatAnalyticsService
+from backend.data_access.ChatMessages.chatRollups import ChatRollupRepository
+from backend.infrastructure.mongodb.indexes import ensure_indexes
+
+ORG_ID = 1
+
+
+def legacy_counts(collection, organisation_id, start, end):
+    # The endpoint body before rollups: every user message in range comes back to Python.
+    daily_counts = {}
+    hourly_counts = {}
+    unique_users = set()
+    unique_sessions = set()
+
+    for r in collection.find({"organisationId": organisation_id, "sender": "user", "timestamp": {"$gte": start, "$lt": end}}):
+        ts = r.get("timestamp")
+        if not ts:
+            continue
+        day = ts.strftime("%Y-%m-%d")
+        daily_counts[day] = daily_counts.get(day, 0) + 1
+        hourly_counts[ts.hour] = hourly_counts.get(ts.hour, 0) + 1
+        if r.get("senderUserId"):
+            unique_users.add(r.get("senderUserId"))
+        elif r.get("sessionId"):
+            unique_sessions.add(r.get("sessionId"))
+
+    return daily_counts, hourly_counts, len(unique_users) if unique_users else len(unique_sessions), 0.0
+
+
+def seed(db, messages: int, days: int, end: datetime) -> None:
+    rnd = random.Random(42)
+    span = days * 24 * 3600
+    batch = []
+    for i in range(messages):
+        # Half the user messages come from signed-in users, the rest from anonymous sessions.
+        signed_in = rnd.random() < 0.5
+        batch.append({
+            "organisationId": ORG_ID if i % 10 else 2,
+            "chatbotId": ORG_ID if i % 10 else 2,
+            "sessionId": f"s-{rnd.randrange(messages // 20 or 1)}",
+            "sender": "user" if i % 2 else "bot",
+            "senderUserId": rnd.randrange(1, 5000) if signed_in else None,
+            "message": "what are your opening hours",
+            "timestamp": end - timedelta(seconds=rnd.randrange(span)),
+            "metadata": {"intent": "business_hours"},
+        })
+        if len(batch) == 10_000:
+            db.chatMessages.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        db.chatMessages.insert_many(batch, ordered=False)
+
+
+def _time(fn, rounds: int):
+    result = fn()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return result, (time.perf_counter() - started) * 1000 / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chatbot analytics: Python loop vs $facet vs rollups.")
+    parser.add_argument("--uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="botforge_analytics_bench")
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    args = parser.parse_args()
+
+    if args.db == os.getenv("MONGO_DB_NAME"):
+        parser.error("the benchmark drops its database; do not point it at MONGO_DB_NAME")
+
+    client = MongoClient(args.uri)
+    client.drop_database(args.db)
+    db = client[args.db]
+    try:
+        end_day = datetime.now(timezone.utc).date()
+        day_from = end_day - timedelta(days=args.days - 1)
+        start = datetime.combine(day_from, datetime.min.time())
+        end = datetime.combine(end_day + timedelta(days=1), datetime.min.time())
+
+        print(f"Seeding {args.messages} messages over {args.days} days...")
+        seed(db, args.messages, args.days, end - timedelta(seconds=1))
+        ensure_indexes(db)
+
+        rollups = ChatRollupRepository(db)
+        started = time.perf_counter()
+        rollups.rebuild(day_from, end_day)
+        rebuild_ms = (time.perf_counter() - started) * 1000
+
+        by_rollups = ChatAnalyticsService(rollups)
+        by_facet = ChatAnalyticsService(rollups, messages=db.chatMessages, source="aggregate")
+
+        legacy, legacy_ms = _time(lambda: legacy_counts(db.chatMessages, ORG_ID, start, end), args.rounds)
+        facet, facet_ms = _time(lambda: by_facet._counts_from_messages(ORG_ID, day_from, end_day), args.rounds)
+        rolled, rollup_ms = _time(lambda: by_rollups._counts_from_rollups(ORG_ID, day_from, end_day), args.rounds)
+        assert legacy == facet, "$facet disagrees with the Python loop"
+        assert legacy[:2] == rolled[:2], "rollup counts disagree with the Python loop"
+        # Rollups count visitors with HyperLogLog; allow four standard errors.
+        assert abs(rolled[2] - legacy[2]) <= 4 * rolled[3] * legacy[2], "rollup unique users out of bounds"
+
+        matched = sum(legacy[0].values())
+        print(f"org {ORG_ID}: {matched} user messages in range, {args.rounds} rounds")
+        print(f"unique users: exact {legacy[2]}, rollup estimate {rolled[2]} ({(rolled[2] - legacy[2]) / max(legacy[2], 1):+.2%}, stated error {rolled[3]:.2%})")
+        print(f"{'source':<12} {'ms/request':>11}")
+        print(f"{'python loop':<12} {legacy_ms:>11.1f}")
+        print(f"{'$facet':<12} {facet_ms:>11.1f}  ({legacy_ms / facet_ms:.1f}x)")
+        print(f"{'rollups':<12} {rollup_ms:>11.1f}  ({legacy_ms / rollup_ms:.1f}x, one-off rebuild {rebuild_ms:.0f} ms)")
+    finally:
+        if not args.keep:
+            client.drop_database(args.db)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,57 @@
-from datetime import datetime
+import base64
+import binascii
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
 from typing import Optional, Iterator
 
+from bson import ObjectId
+from bson.errors import InvalidId
+
 from backend.data_access.ChatMessages.chatMessages import ChatMessageRepository
+from backend.infrastructure.cache.ttl_cache import TTLCache
+
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("CHAT_HISTORY_COUNT_TTL_SECONDS", "60"))
+
+# Exact history totals per filter; shared by every request in the worker.
+_count_cache = TTLCache(maxsize=1024, ttl_seconds=COUNT_CACHE_TTL_SECONDS)
+
+
+def _filter_key(query: dict) -> str:
+    return hashlib.sha1(json.dumps(query, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def encode_cursor(timestamp: Optional[datetime], message_id: ObjectId, filter_key: str) -> str:
+    """
+    Opaque continuation token: position (timestamp ms, _id) plus the filters
+    it belongs to. Rows without a timestamp sort last and get an _id-only
+    position ("t": null).
+    """
+    millis = None
+    if timestamp is not None:
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        millis = int(timestamp.timestamp() * 1000)
+    payload = {"t": millis, "i": str(message_id), "f": filter_key}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, filter_key: str) -> tuple[Optional[datetime], ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        timestamp = None
+        if payload["t"] is not None:
+            timestamp = datetime.fromtimestamp(int(payload["t"]) / 1000, tz=timezone.utc)
+        message_id = ObjectId(payload["i"])
+    except (binascii.Error, ValueError, TypeError, KeyError, InvalidId):
+        raise ValueError("Invalid cursor")
+
+    if payload.get("f") != filter_key:
+        raise ValueError("Cursor does not match the current filters")
+    return timestamp, message_id
 
 
 class ChatHistoryService:
@@ -10,19 +60,18 @@ class ChatHistoryService:
     """
 
     EXPORT_LIMIT = 10_000  # hard safety cap for free tier
+    MAX_PAGE_SIZE = 200
 
     def __init__(self, repo: ChatMessageRepository):
         self.repo = repo
 
-    def get_chat_history(
+    def _history_query(
         self,
         organisation_id: int,
-        keyword: Optional[str] = None,
-        date_from: Optional[datetime] = None,
-        date_to: Optional[datetime] = None,
-        page: int = 1,
-        page_size: int = 20,
-    ):
+        keyword: Optional[str],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+    ) -> dict:
         query = {"organisationId": organisation_id}
 
         if keyword:
@@ -35,19 +84,99 @@ class ChatHistoryService:
             if date_to:
                 query["timestamp"]["$lte"] = date_to
 
-        skip = max(page - 1, 0) * page_size
+        return query
 
-        total = self.repo.collection.count_documents(query)
+    def count_chat_history(self, query: dict) -> int:
+        """Exact count, cached per filter for COUNT_CACHE_TTL_SECONDS (one count per filter, not per page)."""
+        key = _filter_key(query)
+        return _count_cache.get_or_load(key, lambda: self.repo.collection.count_documents(query))
 
-        cursor = (
+    def get_chat_history_page(
+        self,
+        organisation_id: int,
+        keyword: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        page: Optional[int] = None,
+        include_total: bool = False,
+    ) -> dict:
+        """
+        Newest-first history with keyset pagination on (timestamp, _id).
+
+        Pass the returned `next_cursor` back as `cursor` for the next page;
+        each page is an index range scan no matter how deep it is. `page`
+        (skip-based) is still accepted for older clients. The exact total is
+        only counted when `include_total` is set.
+
+        Raises ValueError for a malformed cursor or one issued for other filters.
+        """
+        page_size = min(max(int(page_size), 1), self.MAX_PAGE_SIZE)
+        query = self._history_query(organisation_id, keyword, date_from, date_to)
+        filter_key = _filter_key(query)
+
+        find_query = query
+        skip = 0
+        if cursor:
+            ts, oid = decode_cursor(cursor, filter_key)
+            if ts is None:
+                # Inside the trailing run of timestamp-less rows.
+                after = {"timestamp": None, "_id": {"$lt": oid}}
+            else:
+                # Timestamp-less rows sort after every dated one.
+                after = {"$or": [
+                    {"timestamp": {"$lt": ts}},
+                    {"timestamp": ts, "_id": {"$lt": oid}},
+                    {"timestamp": None},
+                ]}
+            find_query = {"$and": [query, after]}
+        elif page and page > 1:
+            skip = (page - 1) * page_size
+
+        rows = list(
             self.repo.collection
-            .find(query)
-            .sort("timestamp", -1)
+            .find(find_query)
+            .sort([("timestamp", -1), ("_id", -1)])
             .skip(skip)
-            .limit(page_size)
+            .limit(page_size + 1)
         )
 
-        return total, list(cursor)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor(last.get("timestamp"), last["_id"], filter_key)
+
+        return {
+            "rows": rows,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "total": self.count_chat_history(query) if include_total else None,
+        }
+
+    def get_chat_history(
+        self,
+        organisation_id: int,
+        keyword: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        page: int = 1,
+        page_size: int = 20,
+    ):
+        """Page-number variant returning (total, rows); prefer get_chat_history_page."""
+        result = self.get_chat_history_page(
+            organisation_id=organisation_id,
+            keyword=keyword,
+            date_from=date_from,
+            date_to=date_to,
+            page_size=page_size,
+            page=page,
+            include_total=True,
+        )
+        return result["total"], result["rows"]
 
     # ==========================
     # CSV EXPORT (STREAMING)
@@ -63,17 +192,7 @@ class ChatHistoryService:
         Streams CSV rows to avoid memory spikes.
         """
 
-        query = {"organisationId": organisation_id}
-
-        if keyword:
-            query["message"] = {"$regex": keyword, "$options": "i"}
-
-        if date_from or date_to:
-            query["timestamp"] = {}
-            if date_from:
-                query["timestamp"]["$gte"] = date_from
-            if date_to:
-                query["timestamp"]["$lte"] = date_to
+        query = self._history_query(organisation_id, keyword, date_from, date_to)
 
         cursor = (
             self.repo.collection
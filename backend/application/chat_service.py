@@ -1,9 +1,38 @@
+import logging
+from datetime import timedelta
+
+from bson import ObjectId
+
 from backend.data_access.ChatMessages.chatMessages import ChatMessage, ChatMessageRepository
 
+logger = logging.getLogger(__name__)
+
 class ChatMessageService:
-    """Application service for storing chat messages only."""
-    def __init__(self, repo: ChatMessageRepository):
+    """
+    Application service for storing chat messages only.
+
+    With a write-behind `writer` (async persistence mode) messages are queued
+    and written in batches off the request path; ids are assigned up front so
+    callers still get them back. Without one every save is a direct insert.
+
+    After a direct insert the documents are handed to `rollup_recorder`
+    (a BackgroundBatcher around ChatRollupRepository.record), so analytics
+    rollups are updated off the request path; a writer updates them per
+    batch through its on_written callback instead.
+    """
+    def __init__(self, repo: ChatMessageRepository, writer=None, rollup_recorder=None):
         self.repo = repo
+        self.writer = writer
+        self.rollup_recorder = rollup_recorder
+
+    def _record_rollups(self, messages: list[ChatMessage]) -> None:
+        if self.rollup_recorder is None:
+            return
+        try:
+            self.rollup_recorder.submit([m.to_dict() for m in messages])
+        except Exception:
+            # The message is stored; the compaction job repairs the rollup.
+            logger.exception("Could not update chat rollups")
 
     def save_message(
         self,
@@ -16,6 +45,7 @@ class ChatMessageService:
         sender_name: str | None = None,
         intent: str | None = None,
         embedding_id: str | None = None,
+        timings: dict | None = None,
     ) -> str:
         chat_message = ChatMessage(
             organisation_id=organisation_id,
@@ -27,8 +57,75 @@ class ChatMessageService:
             message=message,
             intent=intent,
             embedding_id=embedding_id,
+            timings=timings,
+        )
+        if self.writer is not None:
+            chat_message._id = ObjectId()
+            self.writer.submit([chat_message.to_dict()])
+            return str(chat_message._id)
+        message_id = self.repo.insert(chat_message)
+        self._record_rollups([chat_message])
+        return message_id
+
+    def save_turn(
+        self,
+        organisation_id: int,
+        chatbot_id: int,
+        session_id: str,
+        user_message: str,
+        bot_message: str,
+        sender_user_id: int | None = None,
+        sender_name: str | None = None,
+        intent: str | None = None,
+        confidence: float | None = None,
+        timings: dict | None = None,
+    ) -> list[str]:
+        """
+        Saves the user message and the bot reply of one turn together. Both
+        carry the same metadata.turnId so history readers can group them;
+        the bot reply is timestamped just after the user message so the
+        pair keeps its order. `confidence` is the intent classifier's score
+        for the user message; `timings` (ms per reply stage) go on the bot
+        reply.
+
+        Direct saves are one insert_many that removes a partly written turn
+        on failure (see ChatMessageRepository.insert_turn). Queued turns are
+        written in one write-behind batch. Neither is a transaction, so a
+        lone message can remain; readers must not assume every turnId has
+        two messages.
+        """
+        turn_id = ObjectId()
+        user = ChatMessage(
+            organisation_id=organisation_id,
+            chatbot_id=chatbot_id,
+            session_id=session_id,
+            sender="user",
+            sender_user_id=sender_user_id,
+            sender_name=sender_name,
+            message=user_message,
+            intent=intent,
+            turn_id=str(turn_id),
+            confidence=confidence,
         )
-        return self.repo.insert(chat_message)
+        bot = ChatMessage(
+            organisation_id=organisation_id,
+            chatbot_id=chatbot_id,
+            session_id=session_id,
+            sender="bot",
+            message=bot_message,
+            intent=intent,
+            timestamp=user.timestamp + timedelta(milliseconds=1),
+            turn_id=str(turn_id),
+            timings=timings,
+        )
+
+        if self.writer is not None:
+            user._id, bot._id = ObjectId(), ObjectId()
+            self.writer.submit([user.to_dict(), bot.to_dict()])
+            return [str(user._id), str(bot._id)]
+        message_ids = self.repo.insert_turn([user, bot])
+        self._record_rollups([user, bot])
+        return message_ids
 
     def get_session_messages(
         self,
@@ -1,7 +1,12 @@
+import logging
 from datetime import datetime, timezone
 from bson import ObjectId
 from typing import Optional
 
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
 class ChatMessage:
     """
     Domain representation of a chat message.
@@ -21,6 +26,9 @@ class ChatMessage:
         embedding_id: Optional[str] = None,
         timestamp: Optional[datetime] = None,
         _id: Optional[ObjectId] = None,
+        turn_id: Optional[str] = None,
+        confidence: Optional[float] = None,
+        timings: Optional[dict] = None,
     ):
         self._id = _id
         self.organisation_id = organisation_id
@@ -31,12 +39,22 @@ class ChatMessage:
         self.sender_name = sender_name
         self.message = message
         self.timestamp = timestamp or datetime.now(timezone.utc)
+        self.turn_id = turn_id
+        self.confidence = confidence
+        self.timings = timings
 
         self.metadata = {}
         if intent:
             self.metadata["intent"] = intent
+        if confidence is not None:
+            self.metadata["confidence"] = confidence
         if embedding_id:
             self.metadata["embeddingId"] = embedding_id
+        if turn_id:
+            self.metadata["turnId"] = turn_id
+        if timings:
+            # Milliseconds per reply stage, on bot messages.
+            self.metadata["timings"] = timings
 
     def to_dict(self) -> dict:
         doc = {
@@ -70,6 +88,9 @@ class ChatMessage:
             embedding_id=doc.get("metadata", {}).get("embeddingId"),
             timestamp=doc.get("timestamp"),
             _id=doc.get("_id"),
+            turn_id=doc.get("metadata", {}).get("turnId"),
+            confidence=doc.get("metadata", {}).get("confidence"),
+            timings=doc.get("metadata", {}).get("timings"),
         )
 
 
@@ -85,6 +106,35 @@ class ChatMessageRepository:
         result = self.collection.insert_one(message.to_dict())
         return str(result.inserted_id)
 
+    def insert_many(self, messages: list[ChatMessage], ordered: bool = True) -> list[str]:
+        result = self.collection.insert_many([m.to_dict() for m in messages], ordered=ordered)
+        return [str(i) for i in result.inserted_ids]
+
+    def insert_turn(self, messages: list[ChatMessage]) -> list[str]:
+        """
+        Inserts the messages of one chat turn with a single ordered
+        insert_many (one round trip, no transaction, so any deployment).
+
+        If the insert fails part way, the messages already written are
+        deleted again before re-raising. That is best effort: if the delete
+        fails too, a lone message with the turn's metadata.turnId remains.
+        """
+        for m in messages:
+            if m._id is None:
+                m._id = ObjectId()
+        docs = [m.to_dict() for m in messages]
+        message_ids = [str(doc["_id"]) for doc in docs]
+
+        try:
+            self.collection.insert_many(docs, ordered=True)
+        except PyMongoError:
+            try:
+                self.collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+            except PyMongoError:
+                logger.exception("Could not remove a partly saved chat turn %s", message_ids)
+            raise
+        return message_ids
+
     def get_by_session(
         self,
         organisation_id: int,
@@ -0,0 +1,360 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from pymongo import ReplaceOne, UpdateOne
+
+from backend.infrastructure.sketches.hyperloglog import HyperLogLog
+from backend.infrastructure.sketches.latency_histogram import LatencyHistogram
+
+
+def _utc(ts: datetime) -> datetime:
+    # pymongo hands back naive UTC datetimes; freshly built documents are aware.
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+
+def day_key(day: date) -> str:
+    return day.strftime("%Y-%m-%d")
+
+
+FALLBACK_INTENT = "fallback"
+
+
+def field_name(name) -> str:
+    # Intent and stage names become MongoDB field names.
+    return str(name).replace(".", "_").replace("$", "_")
+
+
+def intent_key(intent) -> str:
+    return field_name(intent or "unknown")
+
+
+class _DayRollup:
+    """Counters for the messages of one bot on one UTC day."""
+
+    def __init__(self):
+        self.count = 0
+        self.hours: dict[int, int] = {}
+        self.intents: dict[str, int] = {}
+        self.fallbacks = 0
+        self.confidence_sum = 0.0
+        self.confidence_count = 0
+        self.users = HyperLogLog()
+        self.sessions = HyperLogLog()
+        self.all_sessions = HyperLogLog()
+        self.latency: dict[str, LatencyHistogram] = {}
+        self.latency_sum: dict[str, float] = {}
+
+    def add_timings(self, timings: dict) -> None:
+        """Adds one bot reply's stage timings (ms)."""
+        for stage, ms in (timings or {}).items():
+            if not isinstance(ms, (int, float)):
+                continue
+            stage = field_name(stage)
+            histogram = self.latency.get(stage)
+            if histogram is None:
+                histogram = self.latency[stage] = LatencyHistogram()
+            histogram.add(ms)
+            self.latency_sum[stage] = self.latency_sum.get(stage, 0.0) + ms
+
+    def add_session(self, session_id) -> None:
+        if session_id:
+            self.all_sessions.add(session_id)
+
+    def add(
+        self,
+        hour: int,
+        sender_user_id=None,
+        session_id=None,
+        count: int = 1,
+        intent=None,
+        confidence_sum: float = 0.0,
+        confidence_count: int = 0,
+    ) -> None:
+        """Adds `count` user messages classified as `intent`."""
+        self.count += count
+        self.hours[hour] = self.hours.get(hour, 0) + count
+        key = intent_key(intent)
+        self.intents[key] = self.intents.get(key, 0) + count
+        if key == FALLBACK_INTENT:
+            self.fallbacks += count
+        self.confidence_sum += confidence_sum
+        self.confidence_count += confidence_count
+        # Same rule as the analytics endpoints: signed-in users by id,
+        # anonymous visitors by session.
+        if sender_user_id:
+            self.users.add(sender_user_id)
+        elif session_id:
+            self.sessions.add(session_id)
+        self.add_session(session_id)
+
+
+class ChatRollupRepository:
+    """
+    Per-bot, per-day (UTC) rollups of chat messages in `chatDailyRollups`:
+
+        {organisationId, chatbotId, day: "YYYY-MM-DD", date,
+         count, hours: {"0".."23": n},     user messages
+         intents: {name: n}, fallbacks,    their classified intents
+         confidenceSum, confidenceCount,   and classifier confidence
+         latency: {stage: {bucket: n}},    bot reply stage timings (ms histograms)
+         latencySum: {stage: ms},
+         usersHll, sessionsHll,            signed-in users / anonymous sessions sending them
+         allSessionsHll,                   every session with a message that day
+         rebuiltAt}                        set by rebuild()
+
+    The *Hll fields are sparse HyperLogLog registers ({"index": rank}), so
+    a document stays a few KiB however busy the day, and sketches of
+    several days, bots or organisations merge into one distinct count.
+
+    record() folds freshly written messages in with $inc/$max upserts, so
+    analytics read one small document per bot and day instead of every
+    message. rebuild() recomputes days from chatMessages (backfill, or
+    repairing drift after a failed record()).
+
+    Rollups only exist for messages recorded or rebuilt, so coverage is
+    tracked in `chatRollupState` ({_id: "coverage", liveFrom, completeFrom}):
+    liveFrom is the first day record() saw, and completeFrom the first day
+    from which every day is complete. complete_from() is None until a
+    rebuild reaching liveFrom has backfilled the days before it.
+    """
+
+    def __init__(self, db):
+        self.collection = db.chatDailyRollups
+        self.messages = db.chatMessages
+        self.state = db.chatRollupState
+        self._live_from: Optional[str] = None
+
+    @staticmethod
+    def _fold(docs: Iterable[dict]) -> dict[tuple, _DayRollup]:
+        rollups: dict[tuple, _DayRollup] = {}
+        for doc in docs:
+            if not doc.get("timestamp"):
+                continue
+            ts = _utc(doc["timestamp"])
+            key = (doc.get("organisationId"), doc.get("chatbotId"), day_key(ts.date()))
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollup = rollups[key] = _DayRollup()
+            if doc.get("sender") == "user":
+                metadata = doc.get("metadata") or {}
+                confidence = metadata.get("confidence")
+                rollup.add(
+                    ts.hour,
+                    doc.get("senderUserId"),
+                    doc.get("sessionId"),
+                    intent=metadata.get("intent"),
+                    confidence_sum=confidence or 0.0,
+                    confidence_count=0 if confidence is None else 1,
+                )
+            else:
+                rollup.add_session(doc.get("sessionId"))
+                rollup.add_timings((doc.get("metadata") or {}).get("timings"))
+        return rollups
+
+    def record(self, docs: Iterable[dict]) -> int:
+        """Adds written chat message documents to their rollups. Returns the number of rollups touched."""
+        rollups = self._fold(docs)
+        if not rollups:
+            return 0
+
+        updates = []
+        for (organisation_id, chatbot_id, day), rollup in rollups.items():
+            inc = {
+                "count": rollup.count,
+                "fallbacks": rollup.fallbacks,
+                "confidenceSum": rollup.confidence_sum,
+                "confidenceCount": rollup.confidence_count,
+            }
+            for hour, count in rollup.hours.items():
+                inc[f"hours.{hour}"] = count
+            for intent, count in rollup.intents.items():
+                inc[f"intents.{intent}"] = count
+            for stage, histogram in rollup.latency.items():
+                for bucket, count in histogram.to_sparse().items():
+                    inc[f"latency.{stage}.{bucket}"] = count
+                inc[f"latencySum.{stage}"] = rollup.latency_sum[stage]
+            update = {
+                "$inc": inc,
+                "$setOnInsert": {"date": datetime.strptime(day, "%Y-%m-%d")},
+            }
+            # Register-wise max is the HyperLogLog merge, applied in place.
+            registers = {}
+            for field, sketch in self._sketches(rollup).items():
+                for index, rank in sketch.to_sparse().items():
+                    registers[f"{field}.{index}"] = rank
+            if registers:
+                update["$max"] = registers
+            updates.append(UpdateOne(
+                {"organisationId": organisation_id, "chatbotId": chatbot_id, "day": day},
+                update,
+                upsert=True,
+            ))
+
+        self.collection.bulk_write(updates, ordered=False)
+        self._mark_live(min(day for _, _, day in rollups))
+        return len(updates)
+
+    def _mark_live(self, day: str) -> None:
+        # One write per process (and per earlier day), not per batch.
+        if self._live_from is not None and self._live_from <= day:
+            return
+        self.state.update_one({"_id": "coverage"}, {"$min": {"liveFrom": day}}, upsert=True)
+        self._live_from = day
+
+    def complete_from(self) -> Optional[date]:
+        """First day from which the rollups cover every message, or None when history is not backfilled."""
+        state = self.state.find_one({"_id": "coverage"}, {"completeFrom": 1}) or {}
+        if not state.get("completeFrom"):
+            return None
+        return datetime.strptime(state["completeFrom"], "%Y-%m-%d").date()
+
+    def _extend_coverage(self, day_from: date, day_to: date) -> None:
+        # A rebuilt range makes everything from day_from complete when it
+        # joins up with days already complete or reaches the first live day
+        # (rebuilding that partly recorded day too).
+        state = self.state.find_one({"_id": "coverage"}) or {}
+        complete_from = state.get("completeFrom")
+        live_from = state.get("liveFrom")
+        joins = complete_from is not None and complete_from <= day_key(day_to + timedelta(days=1))
+        reaches_live = live_from is not None and live_from <= day_key(day_to)
+        if joins or reaches_live:
+            self.state.update_one({"_id": "coverage"}, {"$min": {"completeFrom": day_key(day_from)}}, upsert=True)
+
+    @staticmethod
+    def _sketches(rollup: _DayRollup) -> dict[str, HyperLogLog]:
+        return {"usersHll": rollup.users, "sessionsHll": rollup.sessions, "allSessionsHll": rollup.all_sessions}
+
+    def find_range(self, organisation_id: int, day_from: date, day_to: date, fields: Optional[list[str]] = None) -> list[dict]:
+        """One org's rollups for a day range; `fields` limits what is read (default: all but allSessionsHll)."""
+        projection = {"_id": 0, **{field: 1 for field in fields}} if fields else {"_id": 0, "allSessionsHll": 0}
+        return list(self.collection.find(
+            {
+                "organisationId": organisation_id,
+                "day": {"$gte": day_key(day_from), "$lte": day_key(day_to)},
+            },
+            projection,
+        ))
+
+    def session_sketches_by_day(self, day_from: date, day_to: date) -> dict[str, HyperLogLog]:
+        """Every organisation's sessions per day, merged into one sketch per day."""
+        sketches: dict[str, HyperLogLog] = {}
+        cursor = self.collection.find(
+            {"day": {"$gte": day_key(day_from), "$lte": day_key(day_to)}},
+            {"_id": 0, "day": 1, "allSessionsHll": 1},
+        )
+        for doc in cursor:
+            sketch = HyperLogLog.from_sparse(doc.get("allSessionsHll"))
+            if doc["day"] in sketches:
+                sketches[doc["day"]].merge(sketch)
+            else:
+                sketches[doc["day"]] = sketch
+        return sketches
+
+    def rebuild(self, day_from: date, day_to: date, organisation_id: Optional[int] = None) -> list[dict]:
+        """
+        Recomputes the rollups of [day_from, day_to] from chatMessages and
+        replaces the stored ones in place, so readers never see the range
+        empty. Returns the rebuilt documents. A rebuild of all organisations
+        also extends the backfill coverage (see complete_from()).
+
+        Intended for closed days: messages recorded for a day while it is
+        being rebuilt can be counted twice or not at all.
+        """
+        rebuilt_at = datetime.now(timezone.utc)
+        start = datetime.combine(day_from, datetime.min.time())
+        end = datetime.combine(day_to + timedelta(days=1), datetime.min.time())
+        match = {"timestamp": {"$gte": start, "$lt": end}}
+        if organisation_id is not None:
+            match["organisationId"] = organisation_id
+
+        # One group per bot, day, hour, visitor and sender kind: small enough to fold here.
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": {
+                    "org": "$organisationId",
+                    "bot": "$chatbotId",
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                    "hour": {"$hour": "$timestamp"},
+                    "user": {"$ifNull": ["$senderUserId", None]},
+                    "session": {"$ifNull": ["$sessionId", None]},
+                    "from_user": {"$eq": ["$sender", "user"]},
+                    "intent": {"$ifNull": ["$metadata.intent", None]},
+                },
+                "count": {"$sum": 1},
+                "confidence_sum": {"$sum": "$metadata.confidence"},
+                # Numbers sort above null and missing values.
+                "confidence_count": {"$sum": {"$cond": [{"$gt": ["$metadata.confidence", None]}, 1, 0]}},
+            }},
+        ]
+
+        rollups: dict[tuple, _DayRollup] = {}
+        for row in self.messages.aggregate(pipeline, allowDiskUse=True):
+            group = row["_id"]
+            key = (group["org"], group["bot"], group["day"])
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollup = rollups[key] = _DayRollup()
+            if group.get("from_user"):
+                rollup.add(
+                    group["hour"],
+                    group.get("user"),
+                    group.get("session"),
+                    count=row["count"],
+                    intent=group.get("intent"),
+                    confidence_sum=row.get("confidence_sum") or 0.0,
+                    confidence_count=row.get("confidence_count") or 0,
+                )
+            else:
+                rollup.add_session(group.get("session"))
+
+        # Timings are bucketed per message, so bot replies that carry them are read back.
+        timed = {"sender": {"$ne": "user"}, "metadata.timings": {"$exists": True}, **match}
+        projection = {"_id": 0, "organisationId": 1, "chatbotId": 1, "timestamp": 1, "metadata.timings": 1}
+        for doc in self.messages.find(timed, projection).batch_size(5000):
+            key = (doc.get("organisationId"), doc.get("chatbotId"), day_key(_utc(doc["timestamp"]).date()))
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollup = rollups[key] = _DayRollup()
+            rollup.add_timings(doc["metadata"]["timings"])
+
+        docs = [
+            {
+                "organisationId": organisation_id_,
+                "chatbotId": chatbot_id,
+                "day": day,
+                "date": datetime.strptime(day, "%Y-%m-%d"),
+                "count": rollup.count,
+                "hours": {str(hour): count for hour, count in sorted(rollup.hours.items())},
+                "intents": dict(sorted(rollup.intents.items())),
+                "fallbacks": rollup.fallbacks,
+                "confidenceSum": rollup.confidence_sum,
+                "confidenceCount": rollup.confidence_count,
+                "latency": {stage: histogram.to_sparse() for stage, histogram in sorted(rollup.latency.items())},
+                "latencySum": dict(sorted(rollup.latency_sum.items())),
+                **{field: sketch.to_sparse() for field, sketch in self._sketches(rollup).items()},
+                "rebuiltAt": rebuilt_at,
+            }
+            for (organisation_id_, chatbot_id, day), rollup in sorted(rollups.items(), key=lambda item: item[0][2])
+        ]
+        if docs:
+            self.collection.bulk_write([
+                ReplaceOne(
+                    {"organisationId": doc["organisationId"], "chatbotId": doc["chatbotId"], "day": doc["day"]},
+                    dict(doc),
+                    upsert=True,
+                )
+                for doc in docs
+            ], ordered=False)
+
+        # Rollups of bots and days that no longer have any messages.
+        stale = {"day": {"$gte": day_key(day_from), "$lte": day_key(day_to)}, "rebuiltAt": {"$ne": rebuilt_at}}
+        if organisation_id is not None:
+            stale["organisationId"] = organisation_id
+        self.collection.delete_many(stale)
+
+        if organisation_id is None:
+            self._extend_coverage(day_from, day_to)
+        return docs
@@ -0,0 +1,128 @@
+import os
+from typing import Optional
+
+from backend.data_access.ai.company_profile_repo import organisation_scope
+from backend.infrastructure.cache.ttl_cache import TTLCache
+from backend.models import Chatbot, Personality
+
+BOT_CONFIG_CACHE_SIZE = int(os.getenv("BOT_CONFIG_CACHE_SIZE", "1024"))
+BOT_CONFIG_CACHE_TTL_SECONDS = float(os.getenv("BOT_CONFIG_CACHE_TTL_SECONDS", "300"))
+# Organisations without a chatbot are remembered only briefly, so a new chatbot answers quickly.
+BOT_CONFIG_MISS_TTL_SECONDS = float(os.getenv("BOT_CONFIG_MISS_TTL_SECONDS", "5"))
+
+PERSONALITIES_SCOPE = "personalities"
+
+
+class BotConfig:
+    """
+    Read model of the settings one chat turn needs: the organisation's
+    chatbot row plus its personality name. Detached from the session, so it
+    can be cached and shared between requests.
+    """
+
+    def __init__(
+        self,
+        bot_id: int,
+        organisation_id: int,
+        name: str,
+        welcome_message: Optional[str],
+        primary_language: Optional[str],
+        tone: Optional[str],
+        allow_emojis: Optional[bool],
+        personality_id: Optional[int] = None,
+        personality_name: Optional[str] = None,
+    ):
+        self.bot_id = bot_id
+        self.organisation_id = organisation_id
+        self.name = name
+        self.welcome_message = welcome_message
+        self.primary_language = primary_language
+        self.tone = tone
+        self.allow_emojis = allow_emojis
+        self.personality_id = personality_id
+        self.personality_name = personality_name
+
+    @staticmethod
+    def from_models(chatbot: Chatbot, personality: Optional[Personality] = None) -> "BotConfig":
+        return BotConfig(
+            bot_id=chatbot.bot_id,
+            organisation_id=chatbot.organisation_id,
+            name=chatbot.name,
+            welcome_message=chatbot.welcome_message,
+            primary_language=chatbot.primary_language,
+            tone=chatbot.tone,
+            allow_emojis=chatbot.allow_emojis,
+            personality_id=chatbot.personality_id,
+            personality_name=personality.name if personality else None,
+        )
+
+
+class BotConfigRepository:
+    """
+    Loads BotConfig (chatbot + personality) for an organisation in one
+    joined query.
+
+    With a CacheVersionWatcher the configs are cached per worker
+    (TTL-bounded) until the organisation's 'org:<id>' or the 'personalities'
+    version moves, or invalidate() is called. "No chatbot" is cached
+    separately for only `miss_ttl_seconds`.
+    """
+
+    def __init__(
+        self,
+        cache_versions=None,
+        cache_size: int = BOT_CONFIG_CACHE_SIZE,
+        ttl_seconds: float = BOT_CONFIG_CACHE_TTL_SECONDS,
+        miss_ttl_seconds: float = BOT_CONFIG_MISS_TTL_SECONDS,
+    ):
+        self.cache_versions = cache_versions
+        self._cache = TTLCache(maxsize=cache_size, ttl_seconds=ttl_seconds)
+        self._misses = TTLCache(maxsize=cache_size, ttl_seconds=miss_ttl_seconds)
+
+    def get_by_organisation_id(self, organisation_id: int | str) -> Optional[BotConfig]:
+        if not organisation_id:
+            return None
+
+        try:
+            org_id = int(organisation_id)
+        except (TypeError, ValueError):
+            return None
+
+        if self.cache_versions is None:
+            return self._load(org_id)
+
+        key = (
+            org_id,
+            self.cache_versions.version(organisation_scope(org_id)),
+            self.cache_versions.version(PERSONALITIES_SCOPE),
+        )
+        config = self._cache.get(key)
+        if config is not None or self._misses.get(key):
+            return config
+
+        config = self._load(org_id)
+        if config is None:
+            self._misses.set(key, True)
+        else:
+            self._cache.set(key, config)
+        return config
+
+    def _load(self, org_id: int) -> Optional[BotConfig]:
+        row = (
+            Chatbot.query
+            .outerjoin(Personality, Personality.personality_id == Chatbot.personality_id)
+            .with_entities(Chatbot, Personality)
+            .filter(Chatbot.organisation_id == org_id)
+            .first()
+        )
+        if not row:
+            return None
+
+        chatbot, personality = row
+        return BotConfig.from_models(chatbot, personality)
+
+    def invalidate(self, organisation_id: int) -> None:
+        """Evicts an organisation's cached config in this worker."""
+        org_id = int(organisation_id)
+        self._cache.invalidate_where(lambda key: key[0] == org_id)
+        self._misses.invalidate_where(lambda key: key[0] == org_id)
@@ -0,0 +1,33 @@
+from flask import has_request_context
+from sqlalchemy import select, text
+
+from backend import db
+from backend.models import CacheVersion
+
+
+class CacheVersionRepository:
+    """
+    Reads and bumps the per-scope versions in `cache_version`.
+
+    Every worker keeps in-process caches (templates, quick replies, ...) and
+    polls this table to find out when another worker or a direct SQL edit
+    changed the rows behind them. Template edits bump their scope from a
+    trigger; application code that rewrites cached rows calls bump() itself.
+    """
+
+    def get_all(self) -> dict[str, int]:
+        query = select(CacheVersion.scope, CacheVersion.version)
+        if has_request_context():
+            # Reuse the request's connection instead of taking a second one
+            # from the small SQL pool. The savepoint keeps a failed read from
+            # aborting the request's transaction.
+            with db.session.begin_nested():
+                rows = db.session.execute(query).all()
+        else:
+            with db.engine.connect() as conn:
+                rows = conn.execute(query).all()
+        return {scope: int(version) for scope, version in rows}
+
+    def bump(self, scope: str) -> None:
+        """Bumps `scope` in the current transaction; the caller commits."""
+        db.session.execute(text("SELECT bump_cache_version(:scope)"), {"scope": scope})
@@ -1,18 +1,38 @@
-from backend import db
-from backend.models import (
-    Organisation,
-    OrganisationRestaurant,
-    OrganisationEducation,
-    OrganisationRetail,
-)
+import os
+
+from sqlalchemy.orm import joinedload
+
+from backend.infrastructure.cache.ttl_cache import TTLCache
+from backend.models import Organisation
+
+COMPANY_PROFILE_CACHE_SIZE = int(os.getenv("COMPANY_PROFILE_CACHE_SIZE", "1024"))
+COMPANY_PROFILE_CACHE_TTL_SECONDS = float(os.getenv("COMPANY_PROFILE_CACHE_TTL_SECONDS", "300"))
+
+
+def organisation_scope(organisation_id: int) -> str:
+    """Cache version scope bumped when an organisation's profile or chatbot settings change."""
+    return f"org:{int(organisation_id)}"
 
 
 class CompanyProfileRepository:
     """
     Repository responsible for fetching organisation (company) profiling
     data used by the chatbot and admin UI.
+
+    With a CacheVersionWatcher the flattened profile is cached per worker
+    (TTL-bounded) until the organisation's 'org:<id>' version moves or
+    invalidate() is called. Without one every call reads the DB.
     """
 
+    def __init__(
+        self,
+        cache_versions=None,
+        cache_size: int = COMPANY_PROFILE_CACHE_SIZE,
+        ttl_seconds: float = COMPANY_PROFILE_CACHE_TTL_SECONDS,
+    ):
+        self.cache_versions = cache_versions
+        self._cache = TTLCache(maxsize=cache_size, ttl_seconds=ttl_seconds)
+
     def get_company_profile(self, organisation_id: int | str):
         """
         Returns a dictionary of all organisation fields needed for
@@ -28,7 +48,26 @@ class CompanyProfileRepository:
         except (TypeError, ValueError):
             return None
 
-        organisation = db.session.get(Organisation, org_id)
+        if self.cache_versions is None:
+            return self._load_profile(org_id)
+
+        key = (org_id, self.cache_versions.version(organisation_scope(org_id)))
+        profile = self._cache.get_or_load(key, lambda: self._load_profile(org_id))
+        # Callers get their own copy; the snapshot is shared by every request in the worker.
+        return dict(profile) if profile is not None else None
+
+    def _load_profile(self, org_id: int):
+        # One query: organisation row plus its subtype rows.
+        organisation = (
+            Organisation.query
+            .options(
+                joinedload(Organisation.restaurant),
+                joinedload(Organisation.education),
+                joinedload(Organisation.retail),
+            )
+            .filter(Organisation.organisation_id == org_id)
+            .one_or_none()
+        )
 
         if not organisation:
             return None
@@ -36,6 +75,11 @@ class CompanyProfileRepository:
         # Convert SQLAlchemy model -> dictionary (including subtype)
         return self._to_dict(organisation)
 
+    def invalidate(self, organisation_id: int) -> None:
+        """Evicts an organisation's cached profile in this worker."""
+        org_id = int(organisation_id)
+        self._cache.invalidate_where(lambda key: key[0] == org_id)
+
     # -------------------------------------------------------------------
     # Helper: Converts Organisation model into data usable by templates
     # -------------------------------------------------------------------
@@ -65,11 +109,11 @@ class CompanyProfileRepository:
             "website_url": org.website_url,
             "business_hours": org.business_hours,
 
-            # Industry-specific fields are loaded from subtype tables below.
+            # Industry-specific fields come from the subtype rows below.
         }
 
         if industry == "restaurant":
-            r = OrganisationRestaurant.query.get(org.organisation_id)
+            r = org.restaurant
             if r:
                 data.update({
                     "cuisine_type": r.cuisine_type,
@@ -83,7 +127,7 @@ class CompanyProfileRepository:
                 })
 
         elif industry == "education":
-            e = OrganisationEducation.query.get(org.organisation_id)
+            e = org.education
             if e:
                 data.update({
                     "institution_type": e.institution_type,
@@ -97,7 +141,7 @@ class CompanyProfileRepository:
                 })
 
         elif industry == "retail":
-            r = OrganisationRetail.query.get(org.organisation_id)
+            r = org.retail
             if r:
                 data.update({
                     "retail_type": r.retail_type,
@@ -1,5 +1,22 @@
+import os
+
+from sqlalchemy import and_, or_
+
+from backend.infrastructure.cache.ttl_cache import TTLCache
 from backend.models import ChatbotQuickReply
 
+QUICK_REPLY_CACHE_SIZE = int(os.getenv("QUICK_REPLY_CACHE_SIZE", "1024"))
+
+GLOBAL_SCOPE = "quick_replies"
+
+# (intent, language) -> quick-reply texts
+ResolutionTable = dict[tuple[str, str], list[str]]
+
+
+def org_scope(organisation_id: int) -> str:
+    return f"quick_replies:org:{int(organisation_id)}"
+
+
 LANGUAGE_MAP = {
     "english": "en",
     "en": "en",
@@ -16,8 +33,16 @@ class QuickReplyRepository:
 
     Reads org-specific rows first, then industry defaults, then general defaults.
     Falls back to an in-code English list if DB does not have data.
+
+    With a CacheVersionWatcher the resolved lists are cached per
+    (organisation, industry) until the 'quick_replies' or
+    'quick_replies:org:<id>' version moves.
     """
 
+    def __init__(self, cache_versions=None, cache_size: int = QUICK_REPLY_CACHE_SIZE):
+        self.cache_versions = cache_versions
+        self._cache = TTLCache(maxsize=cache_size)
+
     DEFAULT_QUICK_REPLIES = {
         "en": [
             "Business hours",
@@ -38,6 +63,48 @@ class QuickReplyRepository:
             "联系客服",
         ],
     }
+    # Intent each known quick-reply button text stands for, per language.
+    # Org admins pick from the English texts (orgAdminAPI._quick_reply_options)
+    # but may save them under any language; rows added directly in the
+    # database can hold any text (see intent_for_row).
+    QUICK_REPLY_INTENTS = {
+        "en": {
+            "Business hours": "business_hours",
+            "Location": "location",
+            "Website": "website",
+            "Contact support": "contact_support",
+            "Pricing": "pricing",
+            "Menu": "menu",
+            "Dining options": "dining_options",
+            "Reservations": "reservation",
+            "Price range": "price_range",
+            "Seating capacity": "seating_capacity",
+            "Products": "products",
+            "Delivery": "delivery",
+            "Returns": "returns",
+            "Warranty": "warranty",
+            "Payment methods": "payment_methods",
+            "Courses": "courses",
+            "Intake": "intake",
+            "Apply": "apply",
+            "Delivery mode": "delivery_mode",
+            "Make a booking": "booking",
+        },
+        "fr": {
+            "Heures d'ouverture": "business_hours",
+            "Localisation": "location",
+            "Tarifs": "pricing",
+            "Contacter le support": "contact_support",
+            "Faire une réservation": "booking",
+        },
+        "zh": {
+            "营业时间": "business_hours",
+            "地址": "location",
+            "价格": "pricing",
+            "联系客服": "contact_support",
+            "预约": "booking",
+        },
+    }
     EXCLUDED_QUICK_REPLIES = {
         "en": {"Make a booking"},
         "fr": {"Faire une réservation"},
@@ -55,57 +122,126 @@ class QuickReplyRepository:
             return replies
         return [reply for reply in replies if reply not in excluded]
 
-    def get_quick_replies(self, company_id: str | int | None, industry: str, intent: str, language: str | None):
-        industry = industry or "default"
-        intent = intent or "any"
+    def intent_for_text(self, text: str, language: str | None) -> str | None:
         language = self._normalize_language(language)
+        return self.QUICK_REPLY_INTENTS.get(language, {}).get((text or "").strip())
 
-        def _rows_to_text(rows):
-            return self._filter_excluded([r.text for r in rows], language)
-
-        def _query(org_id: int | None, ind: str, lang: str, it: str):
-            return (
-                ChatbotQuickReply.query
-                .filter_by(
-                    organisation_id=org_id,
-                    industry=ind,
-                    language=lang,
-                    intent=it,
-                )
-                .order_by(ChatbotQuickReply.display_order.asc())
-                .all()
-            )
+    def intent_for_row(self, row) -> str | None:
+        """
+        Intent a clicked quick-reply row stands for: its text's known intent
+        in the row's language, then in any language, then the row's own
+        intent column when it names one ("any" and "fallback" do not).
+        """
+        intent = self.intent_for_text(row.text, row.language)
+        if intent:
+            return intent
+        text = (row.text or "").strip()
+        for intents in self.QUICK_REPLY_INTENTS.values():
+            if text in intents:
+                return intents[text]
+        if row.intent and row.intent not in ("any", "fallback"):
+            return row.intent
+        return None
+
+    def get_all_rows(self, organisation_id: int | None = None, global_only: bool = False):
+        """
+        Returns quick-reply rows in one query: every row, only global rows
+        (organisation_id IS NULL), or only one organisation's rows.
+        """
+        query = ChatbotQuickReply.query
+        if global_only:
+            query = query.filter(ChatbotQuickReply.organisation_id.is_(None))
+        elif organisation_id is not None:
+            query = query.filter(ChatbotQuickReply.organisation_id == organisation_id)
+        return query.order_by(ChatbotQuickReply.quick_reply_id.asc()).all()
 
-        org_id = None
+    def _org_id(self, company_id) -> int | None:
         try:
-            org_id = int(company_id) if company_id is not None else None
+            return int(company_id) if company_id is not None else None
         except (TypeError, ValueError):
-            org_id = None
+            return None
 
-        # 1) Org-specific for intent, then any
+    def _load_resolution_table(self, org_id: int | None, industry: str) -> ResolutionTable:
+        """
+        Loads every row that can answer for (org, industry) in one query and
+        precomputes the answer for each (intent, language) they cover:
+          1) org-specific for intent, then "any"
+          2) industry defaults for intent, then "any"
+          3) "default" industry for intent, then "any"
+        Intents without rows of their own resolve like "any".
+        """
+        scope_filter = and_(
+            ChatbotQuickReply.organisation_id.is_(None),
+            ChatbotQuickReply.industry.in_({industry, "default"}),
+        )
         if org_id is not None:
-            rows = _query(org_id, industry, language, intent)
-            if rows:
-                return _rows_to_text(rows)
-            rows = _query(org_id, industry, language, "any")
-            if rows:
-                return _rows_to_text(rows)
-
-        # 2) Industry defaults
-        rows = _query(None, industry, language, intent)
-        if rows:
-            return _rows_to_text(rows)
-        rows = _query(None, industry, language, "any")
-        if rows:
-            return _rows_to_text(rows)
-
-        # 3) Default industry
-        rows = _query(None, "default", language, intent)
-        if rows:
-            return _rows_to_text(rows)
-        rows = _query(None, "default", language, "any")
-        if rows:
-            return _rows_to_text(rows)
+            scope_filter = or_(
+                scope_filter,
+                and_(ChatbotQuickReply.organisation_id == org_id, ChatbotQuickReply.industry == industry),
+            )
+
+        rows = (
+            ChatbotQuickReply.query
+            .with_entities(
+                ChatbotQuickReply.organisation_id,
+                ChatbotQuickReply.industry,
+                ChatbotQuickReply.language,
+                ChatbotQuickReply.intent,
+                ChatbotQuickReply.text,
+            )
+            .filter(scope_filter)
+            .order_by(ChatbotQuickReply.display_order.asc(), ChatbotQuickReply.quick_reply_id.asc())
+            .all()
+        )
+
+        grouped: dict = {}
+        for r in rows:
+            grouped.setdefault((r.organisation_id, r.industry, r.language, r.intent), []).append(r.text)
+
+        scopes = [(None, industry), (None, "default")]
+        if org_id is not None:
+            scopes.insert(0, (org_id, industry))
+
+        table: ResolutionTable = {}
+        for language in {r.language for r in rows}:
+            intents = {r.intent for r in rows if r.language == language} | {"any"}
+            for intent in intents:
+                for scope_org, scope_industry in scopes:
+                    texts = (
+                        grouped.get((scope_org, scope_industry, language, intent))
+                        or grouped.get((scope_org, scope_industry, language, "any"))
+                    )
+                    if texts:
+                        table[(intent, language)] = self._filter_excluded(texts, language)
+                        break
+        return table
+
+    def _resolution_table(self, org_id: int | None, industry: str) -> ResolutionTable:
+        if self.cache_versions is None:
+            return self._load_resolution_table(org_id, industry)
+
+        key = (
+            org_id,
+            industry,
+            self.cache_versions.version(GLOBAL_SCOPE),
+            self.cache_versions.version(org_scope(org_id)) if org_id is not None else None,
+        )
+        return self._cache.get_or_load(key, lambda: self._load_resolution_table(org_id, industry))
+
+    def invalidate(self, organisation_id: int | None = None) -> None:
+        """Drops this worker's cached resolution tables for an organisation (or the global rows)."""
+        if self.cache_versions is not None:
+            self.cache_versions.note_bump(GLOBAL_SCOPE if organisation_id is None else org_scope(organisation_id))
+
+    def get_quick_replies(self, company_id: str | int | None, industry: str, intent: str, language: str | None):
+        industry = industry or "default"
+        intent = intent or "any"
+        language = self._normalize_language(language)
+
+        table = self._resolution_table(self._org_id(company_id), industry)
+        replies = table.get((intent, language), table.get(("any", language)))
+        if replies is not None:
+            return list(replies)
 
         return self._filter_excluded(
             self.DEFAULT_QUICK_REPLIES.get(language, self.DEFAULT_QUICK_REPLIES["en"]),
@@ -0,0 +1,104 @@
+import logging
+import threading
+from collections import ChainMap
+from typing import Dict, Optional, Tuple
+
+from backend.infrastructure.cache.versions import CacheVersionWatcher
+from backend.models import ChatbotTemplate
+
+logger = logging.getLogger(__name__)
+
+# (organisation_id, industry, language, intent) -> template_text
+TemplateRows = Dict[Tuple[Optional[int], str, str, str], str]
+
+GLOBAL_SCOPE = "templates"
+
+
+def org_scope(organisation_id: int) -> str:
+    return f"templates:org:{int(organisation_id)}"
+
+
+class TemplateCatalog:
+    """
+    Per-worker copy of the `chatbot_template` table, so resolving a reply
+    template does not query PostgreSQL on every chat turn.
+
+    Global rows (organisation_id NULL) are loaded at startup; an
+    organisation's overrides are loaded the first time that organisation is
+    served. Each part remembers the cache version it was loaded at and is
+    reloaded once the version moves ('templates' for global rows,
+    'templates:org:<id>' for overrides). The chatbot_template trigger bumps
+    these versions on every insert/update/delete.
+
+    Rows are keyed exactly like TemplateRepository._load_candidates, keeping
+    the lowest template_id per key.
+    """
+
+    def __init__(self, watcher: CacheVersionWatcher):
+        self.watcher = watcher
+        self._lock = threading.Lock()
+        self._global: Optional[Tuple[tuple, TemplateRows]] = None
+        self._by_org: Dict[int, Tuple[tuple, TemplateRows]] = {}
+
+    def _query_rows(self, organisation_id: Optional[int]) -> TemplateRows:
+        if organisation_id is None:
+            org_filter = ChatbotTemplate.organisation_id.is_(None)
+        else:
+            org_filter = ChatbotTemplate.organisation_id == organisation_id
+
+        rows = (
+            ChatbotTemplate.query
+            .with_entities(
+                ChatbotTemplate.organisation_id,
+                ChatbotTemplate.industry,
+                ChatbotTemplate.language,
+                ChatbotTemplate.intent,
+                ChatbotTemplate.template_text,
+            )
+            .filter(org_filter)
+            .order_by(ChatbotTemplate.template_id.asc())
+            .all()
+        )
+
+        templates: TemplateRows = {}
+        for r in rows:
+            templates.setdefault((r.organisation_id, r.industry, r.language, r.intent), r.template_text)
+        return templates
+
+    def load(self) -> None:
+        """Loads the global templates eagerly (called at startup)."""
+        self._global_rows()
+
+    def _global_rows(self) -> TemplateRows:
+        version = self.watcher.version(GLOBAL_SCOPE)
+        cached = self._global
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        rows = self._query_rows(None)
+        with self._lock:
+            self._global = (version, rows)
+        logger.info("Template catalog loaded %d global templates", len(rows))
+        return rows
+
+    def _org_rows(self, organisation_id: int) -> TemplateRows:
+        version = self.watcher.version(org_scope(organisation_id))
+        cached = self._by_org.get(organisation_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        rows = self._query_rows(organisation_id)
+        with self._lock:
+            self._by_org[organisation_id] = (version, rows)
+        return rows
+
+    def candidates(self, organisation_id: Optional[int]) -> ChainMap:
+        """Every template visible to `organisation_id`: its overrides plus the global rows."""
+        global_rows = self._global_rows()
+        if organisation_id is None:
+            return ChainMap(global_rows)
+        return ChainMap(self._org_rows(organisation_id), global_rows)
+
+    def invalidate(self, organisation_id: Optional[int] = None) -> None:
+        """Drops this worker's copy right away (other workers follow via the version table)."""
+        self.watcher.note_bump(GLOBAL_SCOPE if organisation_id is None else org_scope(organisation_id))
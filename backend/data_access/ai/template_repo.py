@@ -10,6 +10,8 @@
 
 # backend/data_access/ai/template_repo.py
 
+from sqlalchemy import or_
+
 from backend.models import ChatbotTemplate
 
 LANGUAGE_MAP = {
@@ -105,77 +107,124 @@ class TemplateRepository:
         # }
     }
 
+    def __init__(self, catalog=None):
+        # Optional TemplateCatalog; without one every lookup queries the DB.
+        self.catalog = catalog
+
     def _normalize_language(self, language: str | None) -> str:
         if not language:
             return "en"
         return LANGUAGE_MAP.get(language.strip().lower(), "en")
 
-    def get_template(self, company_id: str, industry: str, intent: str, language: str | None = None) -> str:
+    def _load_candidates(self, org_id: int | None, industry: str, intent: str, languages: list[str]) -> dict:
         """
-        Returns a template string using:
-        1) company override in DB
-        2) industry default in DB
-        3) default fallback in DB
-        4) English in-code fallback
+        Fetches every row that can take part in resolution in one query:
+        (org, industry, 'default') x (intent, 'fallback') x languages.
+        Returns {(organisation_id, industry, language, intent): template_text},
+        keeping the lowest template_id per key.
+        With a catalog the rows come from the in-process copy instead.
         """
-        intent = intent or "fallback"
-        industry = industry or "default"
-        language = self._normalize_language(language)
+        if self.catalog is not None:
+            return self.catalog.candidates(org_id)
 
-        def _db_lookup(org_id: int | None, ind: str, lang: str, it: str):
-            return (
-                ChatbotTemplate.query
-                .filter_by(
-                    organisation_id=org_id,
-                    industry=ind,
-                    language=lang,
-                    intent=it,
-                )
-                .order_by(ChatbotTemplate.template_id.asc())
-                .first()
+        org_filter = ChatbotTemplate.organisation_id.is_(None)
+        if org_id is not None:
+            org_filter = or_(org_filter, ChatbotTemplate.organisation_id == org_id)
+
+        rows = (
+            ChatbotTemplate.query
+            .with_entities(
+                ChatbotTemplate.organisation_id,
+                ChatbotTemplate.industry,
+                ChatbotTemplate.language,
+                ChatbotTemplate.intent,
+                ChatbotTemplate.template_text,
             )
+            .filter(
+                org_filter,
+                ChatbotTemplate.industry.in_({industry, "default"}),
+                ChatbotTemplate.intent.in_({intent, "fallback"}),
+                ChatbotTemplate.language.in_(set(languages)),
+            )
+            .order_by(ChatbotTemplate.template_id.asc())
+            .all()
+        )
 
-        org_id = None
-        try:
-            org_id = int(company_id) if company_id is not None else None
-        except (TypeError, ValueError):
-            org_id = None
+        candidates: dict = {}
+        for r in rows:
+            candidates.setdefault((r.organisation_id, r.industry, r.language, r.intent), r.template_text)
+        return candidates
 
+    def _resolve(self, candidates: dict, org_id: int | None, industry: str, intent: str, language: str) -> str:
+        """
+        Precedence for one language:
+        1) company override in DB
+        2) industry default in DB
+        3) default fallback in DB
+        4) English in-code fallback
+        """
         # Collect fallbacks, but prefer an explicit intent template (DB or in-code) over DB "fallback".
         fallback_templates: list[str] = []
 
-        # 1) Company override (language)
+        scopes = [(None, industry), (None, "default")]
         if org_id is not None:
-            row = _db_lookup(org_id, industry, language, intent)
-            if row:
-                return row.template_text
-            row = _db_lookup(org_id, industry, language, "fallback")
-            if row and row.template_text:
-                fallback_templates.append(row.template_text)
-
-        # 2) Industry default (language)
-        row = _db_lookup(None, industry, language, intent)
-        if row:
-            return row.template_text
-        row = _db_lookup(None, industry, language, "fallback")
-        if row and row.template_text:
-            fallback_templates.append(row.template_text)
-
-        # 3) Default industry (language)
-        row = _db_lookup(None, "default", language, intent)
-        if row:
-            return row.template_text
-        row = _db_lookup(None, "default", language, "fallback")
-        if row and row.template_text:
-            fallback_templates.append(row.template_text)
-
-        # 4) In-code fallback for the requested intent (useful when DB doesn't have that intent yet).
+            scopes.insert(0, (org_id, industry))
+
+        for scope_org, scope_industry in scopes:
+            key = (scope_org, scope_industry, language, intent)
+            if key in candidates:
+                return candidates[key]
+            text = candidates.get((scope_org, scope_industry, language, "fallback"))
+            if text:
+                fallback_templates.append(text)
+
+        # In-code fallback for the requested intent (useful when DB doesn't have that intent yet).
         industry_templates = self.DEFAULT_TEMPLATES.get(industry, self.DEFAULT_TEMPLATES["default"])
         if intent in industry_templates:
             return industry_templates[intent]
 
-        # 5) DB fallbacks in order (org -> industry -> default), then in-code fallback.
+        # DB fallbacks in order (org -> industry -> default), then in-code fallback.
         if fallback_templates:
             return fallback_templates[0]
 
         return industry_templates.get("fallback") or self.DEFAULT_TEMPLATES["default"]["fallback"]
+
+    def _org_id(self, company_id) -> int | None:
+        try:
+            return int(company_id) if company_id is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def get_template(self, company_id: str, industry: str, intent: str, language: str | None = None) -> str:
+        """
+        Returns a template string using:
+        1) company override in DB
+        2) industry default in DB
+        3) default fallback in DB
+        4) English in-code fallback
+        """
+        intent = intent or "fallback"
+        industry = industry or "default"
+        language = self._normalize_language(language)
+        org_id = self._org_id(company_id)
+
+        candidates = self._load_candidates(org_id, industry, intent, [language])
+        return self._resolve(candidates, org_id, industry, intent, language)
+
+    def resolve_template(self, company_id: str, industry: str, intent: str, language: str | None = None) -> tuple[str, str]:
+        """
+        Like get_template, but also covers the English retry in one query.
+        Returns (template, language actually used).
+        """
+        intent = intent or "fallback"
+        industry = industry or "default"
+        language = self._normalize_language(language)
+        org_id = self._org_id(company_id)
+
+        candidates = self._load_candidates(org_id, industry, intent, [language, "en"])
+
+        template = self._resolve(candidates, org_id, industry, intent, language)
+        if template or language == "en":
+            return template, language
+
+        return self._resolve(candidates, org_id, industry, intent, "en"), "en"
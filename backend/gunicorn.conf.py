@@ -0,0 +1,50 @@
+# Gunicorn settings. Usage: gunicorn backend.run:app -c backend/gunicorn.conf.py
+#
+# The app is loaded once in the master and shared copy-on-write by the
+# forked workers. With this config CHATBOT_WARMUP defaults to true, so the
+# intent encoder and the memory-mapped intent embeddings are loaded there too
+# and adding workers does not multiply model memory (set it to false to load
+# them lazily per worker instead). The warm-up only loads weights; nothing is
+# encoded in the master, so the torch/OpenMP thread pools are first created
+# inside each worker. DB-backed caches are built per worker in post_fork.
+
+import gc
+import os
+
+# Platforms such as Heroku and Render assign the port through $PORT.
+bind = os.getenv("GUNICORN_BIND") or f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "180"))
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+preload_app = True
+
+# Deliberately on: loading the model before the fork is why the app is preloaded.
+os.environ.setdefault("CHATBOT_WARMUP", "true")
+
+
+def when_ready(server):
+    # Keep the preloaded objects out of the cyclic GC so collections in the
+    # workers do not touch (and un-share) their pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from backend import db
+    from backend.application.ai.service_container import chatbot_services
+    from backend.run import app
+
+    with app.app_context():
+        # Connections opened in the master must not be shared with the workers.
+        db.engine.dispose(close=False)
+        # The quick-reply index and template catalog read the database and
+        # follow cache versions per process, so each worker builds its own.
+        chatbot_services.load_caches()
+
+
+def worker_exit(server, worker):
+    from backend.application.ai.service_container import chatbot_services
+
+    # Write out chat messages still in the write-behind queue.
+    chatbot_services.shutdown()
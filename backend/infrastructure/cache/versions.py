@@ -0,0 +1,77 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION_POLL_SECONDS = float(os.getenv("CACHE_VERSION_POLL_SECONDS", "5"))
+
+
+class CacheVersionWatcher:
+    """
+    Polling view of the shared cache versions (scope -> integer version).
+
+    `loader` returns every scope's current version. It is called at most once
+    every `poll_seconds`, by whichever thread first asks after the interval
+    has passed, so caches see another worker's edit within one poll interval.
+    Scopes that were never bumped read as 0.
+
+    If the versions cannot be read (table not migrated yet, DB down), the last
+    known versions are kept and caches simply stay as they are.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Dict[str, int]],
+        poll_seconds: float = CACHE_VERSION_POLL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._loader = loader
+        self.poll_seconds = max(float(poll_seconds), 0.0)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._local: Dict[str, int] = {}
+        self._next_poll = 0.0
+        self._failing = False
+
+    def _refresh(self) -> None:
+        now = self._clock()
+        if now < self._next_poll:
+            return
+        if not self._lock.acquire(blocking=False):
+            # Another thread is polling; use the versions we already have.
+            return
+        try:
+            if now < self._next_poll:
+                return
+            self._next_poll = now + self.poll_seconds
+            try:
+                versions = self._loader()
+            except Exception:
+                if not self._failing:
+                    logger.warning("Could not read cache versions; keeping cached data", exc_info=True)
+                self._failing = True
+                return
+            self._failing = False
+            self._versions = versions
+        finally:
+            self._lock.release()
+
+    def version(self, scope: str) -> tuple[int, int]:
+        """
+        Returns (shared version, local generation) for `scope`. Callers store
+        the pair with their cached data and reload when it changes.
+        """
+        self._refresh()
+        return self._versions.get(scope, 0), self._local.get(scope, 0)
+
+    def note_bump(self, scope: str) -> None:
+        """
+        Invalidates `scope` in this worker right away, without waiting for the
+        next poll. Other workers pick up the shared bump on their next poll.
+        """
+        with self._lock:
+            self._local[scope] = self._local.get(scope, 0) + 1
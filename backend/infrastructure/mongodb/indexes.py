@@ -0,0 +1,275 @@
+# Declarative MongoDB indexes and a query-plan check for the chat collections.
+#
+#   python -m backend.infrastructure.mongodb.indexes list
+#   python -m backend.infrastructure.mongodb.indexes apply  --uri mongodb://localhost:27017 --db botforge
+#   python -m backend.infrastructure.mongodb.indexes verify --uri mongodb://localhost:27017
+#
+# `verify` runs every registered query shape against a scratch database on
+# the given server and exits non-zero unless each winning plan is an index
+# scan on one of the indexes declared for that shape (no COLLSCAN).
+
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# collection -> indexes it must have. Names are fixed so apply() is idempotent
+# and a changed definition fails loudly instead of creating a duplicate.
+INDEXES: dict[str, list[IndexModel]] = {
+    "chatMessages": [
+        # ChatMessageRepository.get_by_session: one session, newest first.
+        IndexModel(
+            [("organisationId", ASCENDING), ("chatbotId", ASCENDING), ("sessionId", ASCENDING), ("timestamp", DESCENDING)],
+            name="org_bot_session_ts",
+        ),
+        # ChatHistoryService (history page, CSV export): one org, timestamp range/sort.
+        # _id breaks timestamp ties for keyset pagination.
+        IndexModel(
+            [("organisationId", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+            name="org_ts_id",
+        ),
+        # Analytics ($facet source): one org's user messages in a date range.
+        IndexModel(
+            [("organisationId", ASCENDING), ("sender", ASCENDING), ("timestamp", ASCENDING)],
+            name="org_sender_ts",
+        ),
+        # sysadmin dashboard_daily_usage: every org, timestamp range.
+        IndexModel([("timestamp", ASCENDING)], name="ts"),
+    ],
+    "chatDailyRollups": [
+        # ChatRollupRepository: upsert target per bot and day; analytics read one org's day range.
+        IndexModel(
+            [("organisationId", ASCENDING), ("day", ASCENDING), ("chatbotId", ASCENDING)],
+            name="org_day_bot",
+            unique=True,
+        ),
+        # sysadmin dashboard_daily_usage (sessions): every org's sketches for a day range.
+        IndexModel([("day", ASCENDING)], name="day"),
+    ],
+}
+
+
+def ensure_indexes(db) -> dict[str, list[str]]:
+    """Creates every registered index that is missing. Returns the names per collection."""
+    created = {}
+    for collection, models in INDEXES.items():
+        created[collection] = db[collection].create_indexes(models)
+        logger.info("Indexes ensured on %s: %s", collection, ", ".join(created[collection]))
+    return created
+
+
+# Query shapes the app runs, as (name, collection, indexes the plan may use,
+# explain(collection) -> explain output). Keep these in step with the code
+# paths named in INDEXES.
+def query_shapes() -> list[tuple[str, str, tuple[str, ...], Callable]]:
+    now = datetime.now(timezone.utc)
+    week_ago = now - timedelta(days=7)
+
+    def find(query, sort):
+        return lambda c: c.find(query).sort(sort).limit(20).explain()
+
+    def aggregate(pipeline):
+        return lambda c: c.database.command("aggregate", c.name, pipeline=pipeline, explain=True)
+
+    return [
+        ("session history", "chatMessages", ("org_bot_session_ts",), find(
+            {"organisationId": 1, "chatbotId": 1, "sessionId": "s-1"},
+            [("timestamp", DESCENDING)],
+        )),
+        ("chat history page", "chatMessages", ("org_ts_id",), find(
+            {"organisationId": 1, "timestamp": {"$gte": week_ago, "$lte": now}},
+            [("timestamp", DESCENDING), ("_id", DESCENDING)],
+        )),
+        ("chat history next page", "chatMessages", ("org_ts_id",), find(
+            {"$and": [
+                {"organisationId": 1},
+                {"$or": [
+                    {"timestamp": {"$lt": now}},
+                    {"timestamp": now, "_id": {"$lt": ObjectId()}},
+                    {"timestamp": None},
+                ]},
+            ]},
+            [("timestamp", DESCENDING), ("_id", DESCENDING)],
+        )),
+        ("chat history keyword", "chatMessages", ("org_ts_id",), find(
+            {"organisationId": 1, "message": {"$regex": "hours", "$options": "i"}},
+            [("timestamp", DESCENDING), ("_id", DESCENDING)],
+        )),
+        ("chat history export", "chatMessages", ("org_ts_id",), find(
+            {"organisationId": 1, "timestamp": {"$gte": week_ago}},
+            [("timestamp", ASCENDING)],
+        )),
+        ("rollup rebuild", "chatMessages", ("org_ts_id", "org_sender_ts"), find(
+            {"organisationId": 1, "timestamp": {"$gte": week_ago, "$lt": now}},
+            [("timestamp", ASCENDING)],
+        )),
+        ("analytics rollups", "chatDailyRollups", ("org_day_bot",), find(
+            {"organisationId": 1, "day": {"$gte": week_ago.strftime("%Y-%m-%d"), "$lte": now.strftime("%Y-%m-%d")}},
+            [("day", ASCENDING)],
+        )),
+        ("session sketches", "chatDailyRollups", ("day",), find(
+            {"day": {"$gte": week_ago.strftime("%Y-%m-%d"), "$lte": now.strftime("%Y-%m-%d")}},
+            [("day", ASCENDING)],
+        )),
+        ("analytics facet", "chatMessages", ("org_sender_ts",), aggregate([
+            {"$match": {"organisationId": 1, "sender": "user", "timestamp": {"$gte": week_ago, "$lt": now}}},
+            {"$facet": {"hourly": [{"$group": {"_id": {"$hour": "$timestamp"}, "count": {"$sum": 1}}}]}},
+        ])),
+        ("daily usage", "chatMessages", ("ts",), aggregate([
+            {"$match": {"timestamp": {"$gte": week_ago}}},
+            {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}}, "count": {"$sum": 1}}},
+        ])),
+    ]
+
+
+def _plan_nodes(explain: dict) -> list[dict]:
+    """Every stage of the winning plan(s) of an explain() result (find or aggregate)."""
+    nodes: list[dict] = []
+
+    def walk(node, in_plan: bool):
+        if isinstance(node, dict):
+            if in_plan and isinstance(node.get("stage"), str):
+                nodes.append(node)
+            for key, value in node.items():
+                if key == "rejectedPlans":
+                    continue
+                walk(value, in_plan or key in ("winningPlan", "queryPlan"))
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, in_plan)
+
+    walk(explain, False)
+    return nodes
+
+
+def plan_stages(explain: dict) -> list[str]:
+    """Every stage name in the winning plan(s) of an explain() result."""
+    return [node["stage"] for node in _plan_nodes(explain)]
+
+
+def check_plan(explain: dict, allowed_indexes: tuple[str, ...]) -> str | None:
+    """None if the winning plan scans only `allowed_indexes` and never the collection, else why not."""
+    nodes = _plan_nodes(explain)
+    stages = [node["stage"] for node in nodes]
+    if not stages:
+        return "no winning plan in the explain output"
+    if "COLLSCAN" in stages:
+        return "collection scan"
+    used = [node.get("indexName") for node in nodes if node["stage"] in ("IXSCAN", "EXPRESS_IXSCAN")]
+    if not used:
+        return "no index scan"
+    unexpected = [name for name in used if name is not None and name not in allowed_indexes]
+    if unexpected:
+        return f"uses {', '.join(map(str, unexpected))}, expected {' or '.join(allowed_indexes)}"
+    return None
+
+
+def _sample_docs() -> list[dict]:
+    # A few documents so the planner has real index entries to choose from.
+    now = datetime.now(timezone.utc)
+    docs = []
+    for i in range(200):
+        docs.append({
+            "organisationId": i % 5,
+            "chatbotId": i % 5,
+            "sessionId": f"s-{i % 20}",
+            "sender": "user" if i % 2 else "bot",
+            "message": f"message {i}",
+            "timestamp": now - timedelta(minutes=i * 30),
+            "metadata": {"intent": "business_hours"},
+        })
+    return docs
+
+
+def _sample_rollups() -> list[dict]:
+    today = datetime.now(timezone.utc).date()
+    return [
+        {"organisationId": org, "chatbotId": org, "day": (today - timedelta(days=d)).strftime("%Y-%m-%d"), "count": 1}
+        for org in range(5)
+        for d in range(30)
+    ]
+
+
+def seed_scratch(db) -> None:
+    """Resets a scratch database to the sample documents and registered indexes."""
+    for collection in INDEXES:
+        db[collection].drop()
+    db.chatMessages.insert_many(_sample_docs())
+    db.chatDailyRollups.insert_many(_sample_rollups())
+    ensure_indexes(db)
+
+
+def verify(uri: str, db_name: str, keep: bool = False) -> list[str]:
+    """Checks every query shape's plan on a scratch database. Returns the failures (empty when all pass)."""
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    db = client[db_name]
+    try:
+        seed_scratch(db)
+
+        failures = []
+        for name, collection, allowed_indexes, explain in query_shapes():
+            plan = explain(db[collection])
+            problem = check_plan(plan, allowed_indexes)
+            if problem:
+                failures.append(f"{name}: {problem}")
+            print(f"{'FAIL' if problem else 'OK  '} {name:<22} {' <- '.join(plan_stages(plan)) or '(no plan)'}")
+        return failures
+    finally:
+        if not keep:
+            client.drop_database(db_name)
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage MongoDB indexes and check query plans.")
+    parser.add_argument("command", choices=("list", "apply", "verify"))
+    parser.add_argument("--uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", help="database (apply: MONGO_DB_NAME; verify: a scratch database)")
+    parser.add_argument("--keep", action="store_true", help="verify: keep the scratch database")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "list":
+        for collection, models in INDEXES.items():
+            for model in models:
+                print(f"{collection}.{model.document['name']}: {dict(model.document['key'])}")
+        return
+
+    if args.command == "apply":
+        db_name = args.db or os.getenv("MONGO_DB_NAME")
+        if not db_name:
+            parser.error("apply needs --db or MONGO_DB_NAME")
+        client = MongoClient(args.uri)
+        try:
+            ensure_indexes(client[db_name])
+        except OperationFailure as e:
+            print(f"Index creation failed: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            client.close()
+        return
+
+    db_name = args.db or "botforge_index_check"
+    if db_name == os.getenv("MONGO_DB_NAME"):
+        parser.error("verify drops and reseeds its database; do not point it at MONGO_DB_NAME")
+    try:
+        failures = verify(args.uri, db_name, args.keep)
+    except PyMongoError as e:
+        print(f"Query plan check could not run: {e}", file=sys.stderr)
+        sys.exit(2)
+    for failure in failures:
+        print(f"Query plan check failed: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
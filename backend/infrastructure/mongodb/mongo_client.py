@@ -1,12 +1,165 @@
-from pymongo import MongoClient
-from flask import current_app, g
+import atexit
+import logging
+import os
+import threading
+
+from pymongo import MongoClient, monitoring
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+class _PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Counts pool events so we can report connection usage without
+    reaching into pymongo internals.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.created = 0
+            self.closed = 0
+            self.checked_out = 0
+            self.checked_in = 0
+            self.checkout_failed = 0
+            self.pools_cleared = 0
+
+    def _inc(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._inc("pools_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._inc("created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._inc("closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._inc("checkout_failed")
+
+    def connection_checked_out(self, event):
+        self._inc("checked_out")
+
+    def connection_checked_in(self, event):
+        self._inc("checked_in")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connections_open": self.created - self.closed,
+                "connections_created": self.created,
+                "connections_closed": self.closed,
+                "connections_in_use": self.checked_out - self.checked_in,
+                "checkouts": self.checked_out,
+                "checkout_failures": self.checkout_failed,
+                "pools_cleared": self.pools_cleared,
+            }
+
+
+_pool_stats = _PoolStatsListener()
+
+
+def _create_client(config) -> MongoClient:
+    return MongoClient(
+        config["MONGO_URI"],
+        maxPoolSize=config.get("MONGO_MAX_POOL_SIZE", 10),
+        minPoolSize=config.get("MONGO_MIN_POOL_SIZE", 0),
+        maxIdleTimeMS=config.get("MONGO_MAX_IDLE_TIME_MS", 300_000),
+        waitQueueTimeoutMS=config.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5_000),
+        connect=False,
+        event_listeners=[_pool_stats],
+    )
+
+
+def get_mongo_client() -> MongoClient:
+    """
+    Returns the process-wide MongoClient, creating it on first use.
+
+    The client is keyed by pid: a gunicorn worker forked from a master that
+    already touched Mongo gets its own client instead of inheriting sockets.
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    client = _client
+    if client is not None and _client_pid == pid:
+        return client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            if _client is not None:
+                # Inherited from the parent process; never close its sockets from the child.
+                logger.info("Discarding MongoClient inherited across fork (pid %s)", pid)
+            _pool_stats.reset()
+            _client = _create_client(current_app.config)
+            _client_pid = pid
+        return _client
+
 
 def get_mongo_db():
-    if "mongo_client" not in g:
-        g.mongo_client = MongoClient(
-            current_app.config["MONGO_URI"],
-            maxPoolSize=5,      
-            minPoolSize=1,
-        )
-
-    return g.mongo_client[current_app.config["MONGO_DB_NAME"]]
+    return get_mongo_client()[current_app.config["MONGO_DB_NAME"]]
+
+
+def close_mongo_client() -> None:
+    global _client, _client_pid
+
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+def mongo_pool_stats() -> dict:
+    stats = _pool_stats.snapshot()
+    stats["active"] = _client is not None and _client_pid == os.getpid()
+    return stats
+
+
+def init_app(app) -> None:
+    """Registers the shutdown hook for the process-wide client and, if enabled, ensures indexes."""
+    app.extensions["mongo_client"] = get_mongo_client
+    atexit.register(close_mongo_client)
+
+    if app.config.get("MONGO_ENSURE_INDEXES"):
+        from backend.infrastructure.mongodb.indexes import ensure_indexes
+
+        # A short-lived client with a short server selection timeout: under
+        # preload_app this runs in the gunicorn master, whose boot must not
+        # wait out the default 30 s when Mongo is unreachable, nor leave a
+        # client behind for the workers to inherit.
+        timeout_ms = app.config.get("MONGO_ENSURE_INDEXES_TIMEOUT_MS", 2000)
+        client = MongoClient(app.config["MONGO_URI"], serverSelectionTimeoutMS=timeout_ms, connectTimeoutMS=timeout_ms)
+        try:
+            ensure_indexes(client[app.config["MONGO_DB_NAME"]])
+        except Exception:
+            # Startup must not depend on Mongo being reachable; run the CLI instead.
+            logger.exception("Could not ensure MongoDB indexes at startup")
+        finally:
+            client.close()
@@ -0,0 +1,246 @@
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+DUPLICATE_KEY = 11000
+
+
+class WriteBehindWriter:
+    """
+    Buffers documents in a bounded in-process queue and writes them to one
+    collection from a background thread with insert_many(ordered=False).
+
+    - A batch is written once it holds `batch_size` documents or
+      `flush_interval` seconds after its first document arrived.
+    - submit() enqueues a group of documents that always land in the same
+      batch. `max_queue` bounds the number of queued groups (one chat turn
+      is one group of one or two messages), not documents. When the queue
+      is full it blocks for up to `enqueue_timeout` seconds, then writes the
+      group itself (backpressure: a caller may slow down, but nothing is
+      dropped because the writer is behind).
+    - Documents get their _id before being queued, so a failed batch can be
+      retried without creating duplicates.
+    - close() drains the queue; it is called on shutdown. It waits for
+      submit() calls already past the closed check, so every accepted group
+      is queued ahead of the stop marker and written.
+    - `on_written(docs)`, if given, is called with the documents of every
+      batch once they are stored (rollups and other derived data). Its
+      failures are logged and never fail the batch.
+
+    The thread is started on first use in each process, so a writer created
+    before a gunicorn fork is never shared with the workers.
+    """
+
+    def __init__(
+        self,
+        collection,
+        max_queue: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 0.05,
+        enqueue_timeout: float = 0.5,
+        max_retries: int = 3,
+        on_written: Callable[[list[dict]], None] | None = None,
+        thread_name: str = "chat-write-behind",
+    ):
+        self.collection = collection
+        self.thread_name = thread_name
+        self.on_written = on_written
+        self.batch_size = max(int(batch_size), 1)
+        self.flush_interval = max(float(flush_interval), 0.0)
+        self.enqueue_timeout = max(float(enqueue_timeout), 0.0)
+        self.max_retries = max(int(max_retries), 0)
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(int(max_queue), 1))
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._submitting = 0
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._last_full_warning = float("-inf")
+
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.sync_writes = 0
+
+    # Producer side
+    def submit(self, docs: list[dict]) -> None:
+        if not docs:
+            return
+
+        with self._lock:
+            accepting = not self._closed
+            if accepting:
+                self._submitting += 1
+        if not accepting:
+            self._write_now(docs)
+            return
+
+        try:
+            if not self._ensure_thread():
+                self._write_now(docs)
+                return
+            self._queue.put(docs, timeout=self.enqueue_timeout)
+        except queue.Full:
+            now = time.monotonic()
+            if now - self._last_full_warning > 10:
+                self._last_full_warning = now
+                logger.warning("Write-behind queue full; writing synchronously until it drains")
+            self._write_now(docs)
+        finally:
+            with self._idle:
+                self._submitting -= 1
+                if not self._submitting:
+                    self._idle.notify_all()
+
+    def _write_now(self, docs: list[dict]) -> None:
+        with self._lock:
+            self.sync_writes += 1
+        self._write(docs)
+
+    def _ensure_thread(self) -> bool:
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid:
+            return True
+
+        with self._lock:
+            if self._closed:
+                return False
+            if self._thread is None or self._pid != pid:
+                if self._pid is not None and self._pid != pid:
+                    # Anything queued belongs to the parent process.
+                    self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                self._pid = pid
+                self._thread.start()
+        return True
+
+    # Consumer side
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+
+            batch = list(first)
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.extend(item)
+
+            self._write(batch)
+
+    def _write(self, docs: list[dict]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.collection.insert_many(docs, ordered=False)
+                self._record(written=len(docs))
+                self._notify(docs)
+                return
+            except BulkWriteError as e:
+                # Duplicates are documents a previous attempt already wrote.
+                errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != DUPLICATE_KEY]
+                if not errors:
+                    self._record(written=len(docs))
+                    self._notify(docs)
+                    return
+                logger.error("Write-behind batch: %d of %d document(s) rejected: %s", len(errors), len(docs), errors[0])
+                self._record(written=len(docs) - len(errors), failed=len(errors))
+                rejected = {err.get("index") for err in errors}
+                self._notify([doc for i, doc in enumerate(docs) if i not in rejected])
+                return
+            except PyMongoError:
+                if attempt == self.max_retries:
+                    logger.exception("Write-behind batch of %d document(s) failed; giving up", len(docs))
+                    self._record(failed=len(docs))
+                    return
+                time.sleep(min(0.1 * 2 ** attempt, 2.0))
+
+    def _notify(self, docs: list[dict]) -> None:
+        if self.on_written is None or not docs:
+            return
+        try:
+            self.on_written(docs)
+        except Exception:
+            logger.exception("Write-behind on_written callback failed for %d document(s)", len(docs))
+
+    def _record(self, written: int = 0, failed: int = 0) -> None:
+        with self._lock:
+            self.batches += 1
+            self.written += written
+            self.failed += failed
+
+    # Lifecycle
+    def close(self, timeout: float = 10.0) -> None:
+        """Stops accepting work, writes everything still queued and stops the thread."""
+        with self._idle:
+            self._closed = True
+            # Groups being submitted right now go in ahead of _STOP.
+            if not self._idle.wait_for(lambda: not self._submitting, timeout):
+                logger.error("Write-behind close: %d submit(s) still in progress after %.1fs", self._submitting, timeout)
+            thread = self._thread if self._pid == os.getpid() else None
+            self._thread = None
+
+        if thread is None:
+            return
+
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.error("Write-behind queue did not drain in %.1fs; %d group(s) lost", timeout, self._queue.qsize())
+            return
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.error("Write-behind thread did not finish within %.1fs", timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "batches": self.batches,
+                "failed": self.failed,
+                "sync_writes": self.sync_writes,
+            }
+
+
+class BackgroundBatcher(WriteBehindWriter):
+    """
+    Calls `handler(docs)` with batches of submitted documents from a
+    background thread, with WriteBehindWriter's queue, batching, backpressure
+    and drain on close(), but stores nothing itself. Handler failures are
+    logged and not retried, since a handler (e.g. $inc rollups) need not be
+    idempotent.
+    """
+
+    def __init__(self, handler: Callable[[list[dict]], None], thread_name: str = "background-batcher", **kwargs):
+        super().__init__(None, on_written=handler, thread_name=thread_name, **kwargs)
+
+    def _write(self, docs: list[dict]) -> None:
+        try:
+            self.on_written(docs)
+        except Exception:
+            logger.exception("Background batch of %d document(s) failed", len(docs))
+            self._record(failed=len(docs))
+            return
+        self._record(written=len(docs))
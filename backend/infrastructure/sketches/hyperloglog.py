@@ -0,0 +1,104 @@
+import hashlib
+import math
+from typing import Iterable, Mapping
+
+import numpy as np
+
+# 2**12 registers: 4 KiB dense, at most 4096 entries sparse.
+DEFAULT_PRECISION = 12
+
+
+def relative_error(precision: int = DEFAULT_PRECISION) -> float:
+    """Relative standard error of a count: 1.04 / sqrt(2**precision)."""
+    return 1.04 / math.sqrt(1 << precision)
+
+
+def _hash64(value) -> int:
+    # Stable across processes (unlike hash()), so sketches built by
+    # different workers and the compaction job merge correctly.
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """
+    Approximate distinct counter with constant memory (Flajolet et al., with
+    the linear-counting correction for small cardinalities).
+
+    The standard error of count() is relative_error(precision): about 1.6%
+    at the default precision of 12, so roughly 95% of counts fall within
+    +/-3.3% of the true value. Small counts (well under 2**precision) are
+    close to exact.
+
+    Sketches with the same precision merge losslessly (register-wise max):
+    the union of per-day sketches is the sketch of the whole range. They
+    serialise to bytes, or to a sparse {register: rank} mapping that MongoDB
+    can update in place with $max.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: np.ndarray | None = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.m = 1 << precision
+        if registers is None:
+            registers = np.zeros(self.m, dtype=np.uint8)
+        elif registers.shape != (self.m,):
+            raise ValueError(f"expected {self.m} registers, got {registers.shape}")
+        self.registers = registers
+
+    @property
+    def relative_error(self) -> float:
+        return relative_error(self.precision)
+
+    def add(self, value) -> None:
+        x = _hash64(value)
+        index = x >> (64 - self.precision)
+        rest = x & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable) -> "HyperLogLog":
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Folds `other` into this sketch (in place) and returns it."""
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def is_empty(self) -> bool:
+        return not self.registers.any()
+
+    def count(self) -> int:
+        m = self.m
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / float(np.sum(np.exp2(-self.registers.astype(np.float64))))
+
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    # Serialisation
+    def to_bytes(self) -> bytes:
+        return self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        return cls(precision, np.frombuffer(data, dtype=np.uint8).copy())
+
+    def to_sparse(self) -> dict[str, int]:
+        """Non-zero registers as {"index": rank}; string keys so it can be a MongoDB sub-document."""
+        indexes = np.flatnonzero(self.registers)
+        return {str(i): int(self.registers[i]) for i in indexes}
+
+    @classmethod
+    def from_sparse(cls, registers: Mapping[str, int] | None, precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        sketch = cls(precision)
+        for index, rank in (registers or {}).items():
+            sketch.registers[int(index)] = rank
+        return sketch
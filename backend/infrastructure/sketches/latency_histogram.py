@@ -0,0 +1,68 @@
+import math
+from typing import Mapping
+
+# Bucket k >= 1 holds values in (MIN_MS * GROWTH**(k-1), MIN_MS * GROWTH**k];
+# bucket 0 holds everything at or below MIN_MS.
+MIN_MS = 0.01
+GROWTH = 1.1
+_LOG_GROWTH = math.log(GROWTH)
+
+
+def bucket_for(ms: float) -> int:
+    if ms <= MIN_MS:
+        return 0
+    return max(1, math.ceil(math.log(ms / MIN_MS) / _LOG_GROWTH - 1e-9))
+
+
+def bucket_upper_ms(bucket: int) -> float:
+    return MIN_MS * GROWTH ** bucket
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed histogram of durations in milliseconds.
+
+    Buckets grow by 10%, so a quantile read from it is at most 10% above
+    the true value (it reports the bucket's upper edge) and never below it.
+    Histograms merge by adding counts, which makes per-day histograms
+    combinable over any range, and they serialise to a sparse
+    {"bucket": count} mapping that MongoDB can update with $inc.
+    """
+
+    relative_error = round(GROWTH - 1, 4)
+
+    def __init__(self, counts: dict[int, int] | None = None):
+        self.counts: dict[int, int] = dict(counts or {})
+
+    def add(self, ms: float, count: int = 1) -> None:
+        bucket = bucket_for(ms)
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        return self
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def quantile(self, q: float) -> float | None:
+        """Upper edge of the bucket holding the q-quantile (0 < q <= 1); None when empty."""
+        total = self.total
+        if not total:
+            return None
+        rank = max(1, math.ceil(q * total))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return round(bucket_upper_ms(bucket), 3)
+        return round(bucket_upper_ms(max(self.counts)), 3)
+
+    def to_sparse(self) -> dict[str, int]:
+        return {str(bucket): count for bucket, count in self.counts.items() if count}
+
+    @classmethod
+    def from_sparse(cls, counts: Mapping[str, int] | None) -> "LatencyHistogram":
+        return cls({int(bucket): count for bucket, count in (counts or {}).items()})
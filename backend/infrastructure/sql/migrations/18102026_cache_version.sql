@@ -0,0 +1,43 @@
+-- Cache invalidation versions shared by all app workers.
+-- Each worker polls this table and drops in-process caches whose scope version moved.
+-- Scopes: 'templates' (global rows), 'templates:org:<id>' (org overrides).
+
+CREATE TABLE IF NOT EXISTS cache_version (
+    scope VARCHAR(100) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION bump_cache_version(p_scope VARCHAR) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO cache_version (scope, version, updated_at)
+    VALUES (p_scope, 1, CURRENT_TIMESTAMP)
+    ON CONFLICT (scope) DO UPDATE
+    SET version = cache_version.version + 1,
+        updated_at = CURRENT_TIMESTAMP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Template edits are made directly in SQL, so bump the version from a trigger.
+CREATE OR REPLACE FUNCTION chatbot_template_bump_version() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_cache_version(
+            CASE WHEN OLD.organisation_id IS NULL THEN 'templates'
+                 ELSE 'templates:org:' || OLD.organisation_id END
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_cache_version(
+            CASE WHEN NEW.organisation_id IS NULL THEN 'templates'
+                 ELSE 'templates:org:' || NEW.organisation_id END
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_chatbot_template_bump_version ON chatbot_template;
+CREATE TRIGGER trg_chatbot_template_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON chatbot_template
+FOR EACH ROW EXECUTE FUNCTION chatbot_template_bump_version();
@@ -0,0 +1,53 @@
+-- Requires 18102026_cache_version.sql.
+
+-- Rows that feed a chatbot reply for one organisation (profile, industry
+-- details, chatbot settings) bump 'org:<id>'; personality edits bump
+-- 'personalities'. Cached replies, profiles and bot configs key on these.
+CREATE OR REPLACE FUNCTION organisation_bump_version() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_cache_version('org:' || OLD.organisation_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_cache_version('org:' || NEW.organisation_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION personality_bump_version() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_cache_version('personalities');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_organisation_bump_version ON organisation;
+CREATE TRIGGER trg_organisation_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON organisation
+FOR EACH ROW EXECUTE FUNCTION organisation_bump_version();
+
+DROP TRIGGER IF EXISTS trg_organisation_restaurant_bump_version ON organisation_restaurant;
+CREATE TRIGGER trg_organisation_restaurant_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON organisation_restaurant
+FOR EACH ROW EXECUTE FUNCTION organisation_bump_version();
+
+DROP TRIGGER IF EXISTS trg_organisation_education_bump_version ON organisation_education;
+CREATE TRIGGER trg_organisation_education_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON organisation_education
+FOR EACH ROW EXECUTE FUNCTION organisation_bump_version();
+
+DROP TRIGGER IF EXISTS trg_organisation_retail_bump_version ON organisation_retail;
+CREATE TRIGGER trg_organisation_retail_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON organisation_retail
+FOR EACH ROW EXECUTE FUNCTION organisation_bump_version();
+
+DROP TRIGGER IF EXISTS trg_chatbot_bump_version ON chatbot;
+CREATE TRIGGER trg_chatbot_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON chatbot
+FOR EACH ROW EXECUTE FUNCTION organisation_bump_version();
+
+DROP TRIGGER IF EXISTS trg_personality_bump_version ON personality;
+CREATE TRIGGER trg_personality_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON personality
+FOR EACH STATEMENT EXECUTE FUNCTION personality_bump_version();
@@ -0,0 +1,26 @@
+-- Bump the quick-reply cache versions whenever chatbot_quick_reply changes.
+-- Scopes: 'quick_replies' (global rows), 'quick_replies:org:<id>' (org rows).
+-- Requires 18102026_cache_version.sql.
+
+CREATE OR REPLACE FUNCTION chatbot_quick_reply_bump_version() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_cache_version(
+            CASE WHEN OLD.organisation_id IS NULL THEN 'quick_replies'
+                 ELSE 'quick_replies:org:' || OLD.organisation_id END
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_cache_version(
+            CASE WHEN NEW.organisation_id IS NULL THEN 'quick_replies'
+                 ELSE 'quick_replies:org:' || NEW.organisation_id END
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_chatbot_quick_reply_bump_version ON chatbot_quick_reply;
+CREATE TRIGGER trg_chatbot_quick_reply_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON chatbot_quick_reply
+FOR EACH ROW EXECUTE FUNCTION chatbot_quick_reply_bump_version();
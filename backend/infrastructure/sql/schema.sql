@@ -1,6 +1,7 @@
 -- =========================
 -- DROP TABLES (children first)
 -- =========================
+DROP TABLE IF EXISTS cache_version CASCADE;
 DROP TABLE IF EXISTS landing_image CASCADE;
 DROP TABLE IF EXISTS featured_video CASCADE;
 DROP TABLE IF EXISTS analytics CASCADE;
@@ -335,4 +336,113 @@ CREATE TABLE landing_image (
     is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+);
+
+-- =========================
+-- cache versions (in-process cache invalidation across workers)
+-- =========================
+CREATE TABLE cache_version (
+    scope VARCHAR(100) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION bump_cache_version(p_scope VARCHAR) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO cache_version (scope, version, updated_at)
+    VALUES (p_scope, 1, CURRENT_TIMESTAMP)
+    ON CONFLICT (scope) DO UPDATE
+    SET version = cache_version.version + 1,
+        updated_at = CURRENT_TIMESTAMP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION chatbot_template_bump_version() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_cache_version(
+            CASE WHEN OLD.organisation_id IS NULL THEN 'templates'
+                 ELSE 'templates:org:' || OLD.organisation_id END
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_cache_version(
+            CASE WHEN NEW.organisation_id IS NULL THEN 'templates'
+                 ELSE 'templates:org:' || NEW.organisation_id END
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_chatbot_template_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON chatbot_template
+FOR EACH ROW EXECUTE FUNCTION chatbot_template_bump_version();
+
+CREATE OR REPLACE FUNCTION chatbot_quick_reply_bump_version() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_cache_version(
+            CASE WHEN OLD.organisation_id IS NULL THEN 'quick_replies'
+                 ELSE 'quick_replies:org:' || OLD.organisation_id END
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_cache_version(
+            CASE WHEN NEW.organisation_id IS NULL THEN 'quick_replies'
+                 ELSE 'quick_replies:org:' || NEW.organisation_id END
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_chatbot_quick_reply_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON chatbot_quick_reply
+FOR EACH ROW EXECUTE FUNCTION chatbot_quick_reply_bump_version();
+
+-- Rows that feed a chatbot reply for one organisation (profile, industry
+-- details, chatbot settings) bump 'org:<id>'; personality edits bump
+-- 'personalities'. Cached replies, profiles and bot configs key on these.
+CREATE OR REPLACE FUNCTION organisation_bump_version() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_cache_version('org:' || OLD.organisation_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM bump_cache_version('org:' || NEW.organisation_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION personality_bump_version() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_cache_version('personalities');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_organisation_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON organisation
+FOR EACH ROW EXECUTE FUNCTION organisation_bump_version();
+
+CREATE TRIGGER trg_organisation_restaurant_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON organisation_restaurant
+FOR EACH ROW EXECUTE FUNCTION organisation_bump_version();
+
+CREATE TRIGGER trg_organisation_education_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON organisation_education
+FOR EACH ROW EXECUTE FUNCTION organisation_bump_version();
+
+CREATE TRIGGER trg_organisation_retail_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON organisation_retail
+FOR EACH ROW EXECUTE FUNCTION organisation_bump_version();
+
+CREATE TRIGGER trg_chatbot_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON chatbot
+FOR EACH ROW EXECUTE FUNCTION organisation_bump_version();
+
+CREATE TRIGGER trg_personality_bump_version
+AFTER INSERT OR UPDATE OR DELETE ON personality
+FOR EACH STATEMENT EXECUTE FUNCTION personality_bump_version();
@@ -301,6 +301,13 @@ class Analytics(db.Model):
         db.UniqueConstraint("bot_id", "date", name="uq_analytics_bot_date"),
     )
 
+class CacheVersion(db.Model):
+    __tablename__ = "cache_version"
+
+    scope = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, server_default=func.now())
+
 class Invitation(db.Model):
     __tablename__ = "invitation"
 
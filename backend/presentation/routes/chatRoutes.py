@@ -1,17 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_cors import cross_origin
 import traceback
-from backend.application.ai.chatbot_service import ChatbotService
-from backend.application.ai.intent_service_embed import EmbeddingIntentService
-from backend.application.ai.template_engine import TemplateEngine
-from backend.application.chat_service import ChatMessageService
-from backend.data_access.ai.company_profile_repo import CompanyProfileRepository
-from backend.data_access.ai.chatbot_repo import ChatbotRepository
-from backend.data_access.ai.personality_repo import PersonalityRepository
-from backend.data_access.ai.template_repo import TemplateRepository
-from backend.data_access.ai.quick_reply_repo import QuickReplyRepository
-from backend.data_access.ChatMessages.chatMessages import ChatMessageRepository
-from backend.infrastructure.mongodb.mongo_client import get_mongo_db
+from backend.application.ai.service_container import chatbot_services
 
 
 chat_bp = Blueprint("chat", __name__)
@@ -24,30 +14,17 @@ def chat_welcome():
     session_id = request.args.get("session_id")
 
     try:
-        chatbot_repo = ChatbotRepository()
-        chatbot = chatbot_repo.get_by_organisation_id(company_id)
+        bot_config = chatbot_services.bot_config_repository.get_by_organisation_id(company_id)
 
-        if not chatbot:
+        if not bot_config:
             raise ValueError("Chatbot not found")
 
-        chat_message_service = ChatMessageService(
-            ChatMessageRepository(get_mongo_db())
-        )
-
-        chatbot_service = ChatbotService(
-            intent_service=EmbeddingIntentService(),
-            company_repository=CompanyProfileRepository(),
-            template_repository=TemplateRepository(),
-            template_engine=TemplateEngine(),
-            chatbot_repository=chatbot_repo,
-            personality_repository=PersonalityRepository(),
-            chat_message_service=chat_message_service,  # ✅ FIXED
-            quick_reply_repository=QuickReplyRepository(),
-        )
+        chatbot_service = chatbot_services.chatbot_service()
 
         result = chatbot_service.welcome(
             company_id=company_id,
             session_id=session_id,
+            bot_config=bot_config,
         )
 
         return jsonify(result), 200
@@ -73,32 +50,19 @@ def chat():
         ), 400
 
     try:
-        chatbot_repo = ChatbotRepository()
-        chatbot = chatbot_repo.get_by_organisation_id(company_id)
+        bot_config = chatbot_services.bot_config_repository.get_by_organisation_id(company_id)
 
-        if not chatbot:
+        if not bot_config:
             raise ValueError("Chatbot not found")
 
-        chat_message_service = ChatMessageService(
-            ChatMessageRepository(get_mongo_db())
-        )
-
-        chatbot_service = ChatbotService(
-            intent_service=EmbeddingIntentService(),
-            company_repository=CompanyProfileRepository(),
-            template_repository=TemplateRepository(),
-            template_engine=TemplateEngine(),
-            chatbot_repository=chatbot_repo,
-            personality_repository=PersonalityRepository(),
-            chat_message_service=chat_message_service,
-            quick_reply_repository=QuickReplyRepository(),
-        )
+        chatbot_service = chatbot_services.chatbot_service()
 
         result = chatbot_service.chat(
             company_id=company_id,
             message=message,
             session_id=session_id,
             user_id=user_id,
+            bot_config=bot_config,
         )
 
         return jsonify(result), 200
@@ -9,16 +9,10 @@ from backend.application.invitation_service import (
 from backend.application.user_profile_service import UserProfileService
 from backend.application.notification_service import NotificationService
 from backend.application.chat_history_service import ChatHistoryService
+from backend.application.analytics_service import get_analytics_service
 from backend.application.ai.chatbot_service import ChatbotService
-from backend.application.ai.intent_service_embed import EmbeddingIntentService
-from backend.application.ai.template_engine import TemplateEngine
+from backend.application.ai.service_container import chatbot_services
 from backend.application.ai.speech_to_text import transcribe_audio
-from backend.application.chat_service import ChatMessageService
-from backend.data_access.ai.company_profile_repo import CompanyProfileRepository
-from backend.data_access.ai.chatbot_repo import ChatbotRepository
-from backend.data_access.ai.personality_repo import PersonalityRepository
-from backend.data_access.ai.template_repo import TemplateRepository
-from backend.data_access.ai.quick_reply_repo import QuickReplyRepository
 from backend.data_access.Users.users import UserRepository
 from backend.data_access.Notifications.notifications import NotificationRepository
 from backend.data_access.ChatMessages.chatMessages import ChatMessageRepository
@@ -34,26 +28,7 @@ notification_service = NotificationService(notification_repo, user_repo)
 profile_service = UserProfileService(user_repo, notification_service)
 
 def _build_chatbot_service() -> ChatbotService:
-    company_repo = CompanyProfileRepository()
-    template_repo = TemplateRepository()
-    quick_reply_repo = QuickReplyRepository()
-    template_engine = TemplateEngine()
-    intent_service = EmbeddingIntentService()
-    chatbot_repo = ChatbotRepository()
-    personality_repo = PersonalityRepository()
-    mongo_repo = ChatMessageRepository(get_mongo_db())
-    chat_message_service = ChatMessageService(mongo_repo)
-
-    return ChatbotService(
-        intent_service=intent_service,
-        company_repository=company_repo,
-        template_repository=template_repo,
-        template_engine=template_engine,
-        chatbot_repository=chatbot_repo,
-        personality_repository=personality_repo,
-        chat_message_service=chat_message_service,
-        quick_reply_repository=quick_reply_repo,
-    )
+    return chatbot_services.chatbot_service()
 
 # =================================
 # Invitation & registration
@@ -164,6 +139,10 @@ def get_operator_chat_history():
     q = (request.args.get("q") or "").strip()
     date_from = request.args.get("from")
     date_to = request.args.get("to")
+    # Keyset pagination: pass back `next_cursor` as `cursor`.
+    cursor = request.args.get("cursor") or None
+    page_size = request.args.get("page_size", type=int) or 50
+    include_total = (request.args.get("include_total") or "").strip().lower() in ("1", "true", "yes")
 
     from_dt = None
     to_dt = None
@@ -185,18 +164,21 @@ def get_operator_chat_history():
         ChatMessageRepository(get_mongo_db())
     )
 
-    # Operators only see recent messages (no pagination UI yet)
-    _, rows = service.get_chat_history(
-        organisation_id=organisation_id,
-        keyword=q or None,
-        date_from=from_dt,
-        date_to=to_dt,
-        page=1,
-        page_size=50,
-    )
+    try:
+        result = service.get_chat_history_page(
+            organisation_id=organisation_id,
+            keyword=q or None,
+            date_from=from_dt,
+            date_to=to_dt,
+            page_size=page_size,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        return {"error": str(e)}, 400
 
     messages = []
-    for r in rows:
+    for r in result["rows"]:
         ts = r.get("timestamp")
         if ts and ts.tzinfo is None:
             ts = ts.replace(tzinfo=timezone.utc)
@@ -211,7 +193,10 @@ def get_operator_chat_history():
 
     return jsonify({
         "ok": True,
-        "messages": messages
+        "messages": messages,
+        "next_cursor": result["next_cursor"],
+        "has_more": result["has_more"],
+        "total": result["total"],
     }), 200
 
 
@@ -238,59 +223,13 @@ def get_operator_chatbot_analytics():
 
     end = end.replace(hour=23, minute=59, second=59)
 
-    repo = ChatMessageRepository(get_mongo_db())
-
-    query = {
-        "organisationId": organisation_id,
-        "sender": "user",
-        "timestamp": {"$gte": start, "$lte": end},
-    }
-
-    rows = repo.collection.find(query)
-
-    daily_counts = {}
-    hourly_counts = {}
-    unique_users = set()
-    unique_sessions = set()
-
-    for r in rows:
-        ts = r.get("timestamp")
-        if not ts:
-            continue
-
-        day = ts.date()
-        daily_counts[day] = daily_counts.get(day, 0) + 1
-
-        hour = ts.hour
-        hourly_counts[hour] = hourly_counts.get(hour, 0) + 1
-
-        if r.get("senderUserId"):
-            unique_users.add(r.get("senderUserId"))
-        elif r.get("sessionId"):
-            unique_sessions.add(r.get("sessionId"))
-
-    daily_list = []
-    cursor = start.date()
-    while cursor <= end.date():
-        daily_list.append({
-            "date": cursor.strftime("%d-%m-%Y"),
-            "day": cursor.strftime("%A"),
-            "count": daily_counts.get(cursor, 0),
-        })
-        cursor += timedelta(days=1)
-
-    most_active_hour = max(hourly_counts, key=hourly_counts.get) if hourly_counts else None
+    # Whole UTC days from `start` to `end` (rollups or a $facet aggregation; see ANALYTICS_SOURCE).
+    service = get_analytics_service()
+    summary = service.chatbot_summary(organisation_id, start.date(), end.date())
 
     return jsonify({
         "ok": True,
-        "daily_chats": daily_list,
-        "total_chats": sum(daily_counts.values()),
-        "unique_users": len(unique_users) if unique_users else len(unique_sessions),
-        "most_active_hour": {
-            "hour_24": most_active_hour,
-            "label": None if most_active_hour is None else datetime.strptime(str(most_active_hour), "%H").strftime("%I %p"),
-            "count": hourly_counts.get(most_active_hour, 0) if most_active_hour is not None else 0,
-        }
+        **summary,
     }), 200
 
 # export chat history as CSV
@@ -8,16 +8,11 @@ from backend.application.user_service import UserService
 from backend.application.user_profile_service import UserProfileService
 from backend.application.notification_service import NotificationService
 from backend.application.chat_history_service import ChatHistoryService
+from backend.application.analytics_service import get_analytics_service
 from backend.application.ai.chatbot_service import ChatbotService
-from backend.application.ai.intent_service_embed import EmbeddingIntentService
-from backend.application.ai.template_engine import TemplateEngine
+from backend.application.ai.service_container import chatbot_services
 from backend.application.ai.speech_to_text import transcribe_audio
-from backend.application.chat_service import ChatMessageService
 from backend.data_access.ai.company_profile_repo import CompanyProfileRepository
-from backend.data_access.ai.chatbot_repo import ChatbotRepository
-from backend.data_access.ai.personality_repo import PersonalityRepository
-from backend.data_access.ai.template_repo import TemplateRepository
-from backend.data_access.ai.quick_reply_repo import QuickReplyRepository
 from backend.data_access.Users.users import UserRepository
 from backend.data_access.Notifications.notifications import NotificationRepository
 from backend.data_access.ChatMessages.chatMessages import ChatMessageRepository
@@ -36,26 +31,7 @@ profile_service = UserProfileService(user_repo, notification_service)
 
 # Helpers
 def _build_chatbot_service() -> ChatbotService:
-    company_repo = CompanyProfileRepository()
-    template_repo = TemplateRepository()
-    quick_reply_repo = QuickReplyRepository()
-    template_engine = TemplateEngine()
-    intent_service = EmbeddingIntentService()
-    chatbot_repo = ChatbotRepository()
-    personality_repo = PersonalityRepository()
-    mongo_repo = ChatMessageRepository(get_mongo_db())
-    chat_message_service = ChatMessageService(mongo_repo)
-
-    return ChatbotService(
-        intent_service=intent_service,
-        company_repository=company_repo,
-        template_repository=template_repo,
-        template_engine=template_engine,
-        chatbot_repository=chatbot_repo,
-        personality_repository=personality_repo,
-        chat_message_service=chat_message_service,
-        quick_reply_repository=quick_reply_repo,
-    )
+    return chatbot_services.chatbot_service()
 
 def _get_or_create_chatbot(organisation_id: int) -> Chatbot | None:
     org = Organisation.query.get(organisation_id)
@@ -72,6 +48,8 @@ def _get_or_create_chatbot(organisation_id: int) -> Chatbot | None:
     )
     db.session.add(chatbot)
     db.session.commit()
+    # Drop this worker's cached "no chatbot" for the organisation.
+    chatbot_services.invalidate_organisation(organisation_id)
     return chatbot
 
 
@@ -457,8 +435,11 @@ def get_chat_history():
     q = (request.args.get("q") or "").strip()
     date_from = request.args.get("from")
     date_to = request.args.get("to")
-    page = request.args.get("page", type=int) or 1
+    # Keyset pagination: pass back `next_cursor` as `cursor`. `page` still works for older clients.
+    cursor = request.args.get("cursor") or None
+    page = request.args.get("page", type=int)
     page_size = request.args.get("page_size", type=int) or 20
+    include_total = (request.args.get("include_total") or "").strip().lower() in ("1", "true", "yes")
 
     from_dt = None
     to_dt = None
@@ -480,17 +461,22 @@ def get_chat_history():
         ChatMessageRepository(get_mongo_db())
     )
 
-    total, rows = service.get_chat_history(
-        organisation_id=organisation_id,
-        keyword=q or None,
-        date_from=from_dt,
-        date_to=to_dt,
-        page=page,
-        page_size=page_size,
-    )
+    try:
+        result = service.get_chat_history_page(
+            organisation_id=organisation_id,
+            keyword=q or None,
+            date_from=from_dt,
+            date_to=to_dt,
+            page_size=page_size,
+            cursor=cursor,
+            page=page,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        return {"error": str(e)}, 400
 
     messages = []
-    for r in rows:
+    for r in result["rows"]:
         ts = r.get("timestamp")
         if ts and ts.tzinfo is None:
             ts = ts.replace(tzinfo=timezone.utc)
@@ -505,9 +491,11 @@ def get_chat_history():
 
     return jsonify({
         "ok": True,
-        "total": total,
-        "page": page,
+        "total": result["total"],
+        "page": page or 1,
         "page_size": page_size,
+        "next_cursor": result["next_cursor"],
+        "has_more": result["has_more"],
         "messages": messages,
     }), 200
 
@@ -627,6 +615,7 @@ def update_chatbot_settings():
         chatbot.allow_emojis = data.get("allow_emojis")
 
     db.session.commit()
+    chatbot_services.invalidate_organisation(organisation_id)
 
     notification_service.notify_organisation(
         organisation_id=organisation_id,
@@ -762,6 +751,9 @@ def update_org_quick_replies():
 
     db.session.commit()
 
+    chatbot_services.quick_reply_repository.invalidate(organisation_id)
+    chatbot_services.quick_reply_index.rebuild_org(organisation_id)
+
     notification_service.notify_organisation(
         organisation_id=organisation_id,
         title="Chatbot quick replies updated",
@@ -801,54 +793,94 @@ def get_chatbot_analytics():
 
     end = end.replace(hour=23, minute=59, second=59)
 
-    repo = ChatMessageRepository(get_mongo_db())
+    # Whole UTC days from `start` to `end` (rollups or a $facet aggregation; see ANALYTICS_SOURCE).
+    service = get_analytics_service()
+    summary = service.chatbot_summary(organisation_id, start.date(), end.date())
 
-    query = {
-        "organisationId": organisation_id,
-        "sender": "user",
-        "timestamp": {
-            "$gte": start,
-            "$lte": end,
+    return jsonify({
+        "ok": True,
+        "range": {
+            "from": start.strftime("%Y-%m-%d"),
+            "to": end.strftime("%Y-%m-%d"),
+            "timezone": "UTC",
         },
-    }
+        **summary,
+    }), 200
 
-    rows = repo.collection.find(query)
+@org_admin_bp.route("/analytics/intents", methods=["GET", "OPTIONS"])
+@cross_origin()
+def get_intent_analytics():
+    organisation_id = request.args.get("organisation_id", type=int)
+    if not organisation_id:
+        return {"error": "organisation_id is required"}, 400
 
-    daily_counts = {}
-    hourly_counts = {}
-    unique_users = set()
-    unique_sessions = set()
+    top = request.args.get("top", type=int) or 10
+    top = max(1, min(top, 50))
 
-    for r in rows:
-        ts = r.get("timestamp")
-        if not ts:
-            continue
+    date_from = request.args.get("from")
+    date_to = request.args.get("to")
 
-        if ts.tzinfo is None:
-            ts = ts.replace(tzinfo=timezone.utc)
+    # Default range: last 7 days (UTC)
+    try:
+        if date_to:
+            end = datetime.strptime(date_to, "%Y-%m-%d")
+        else:
+            end = datetime.utcnow()
+
+        if date_from:
+            start = datetime.strptime(date_from, "%Y-%m-%d")
+        else:
+            start = end - timedelta(days=6)
+    except ValueError:
+        return {"error": "from/to must be YYYY-MM-DD"}, 400
+
+    if start > end:
+        return {"error": "from must be on or before to"}, 400
 
-        day = ts.date()
-        daily_counts[day] = daily_counts.get(day, 0) + 1
+    # Always from the per-day rollups: no scan of chat history.
+    service = get_analytics_service()
+    summary = service.intent_summary(organisation_id, start.date(), end.date(), top_k=top)
 
-        hour = ts.hour
-        hourly_counts[hour] = hourly_counts.get(hour, 0) + 1
+    return jsonify({
+        "ok": True,
+        "range": {
+            "from": start.strftime("%Y-%m-%d"),
+            "to": end.strftime("%Y-%m-%d"),
+            "timezone": "UTC",
+        },
+        **summary,
+    }), 200
 
-        if r.get("senderUserId"):
-            unique_users.add(r.get("senderUserId"))
-        elif r.get("sessionId"):
-            unique_sessions.add(r.get("sessionId"))
+@org_admin_bp.route("/analytics/latency", methods=["GET", "OPTIONS"])
+@cross_origin()
+def get_latency_analytics():
+    organisation_id = request.args.get("organisation_id", type=int)
+    if not organisation_id:
+        return {"error": "organisation_id is required"}, 400
 
-    daily_list = []
-    cursor = start.date()
-    while cursor <= end.date():
-        daily_list.append({
-            "date": cursor.strftime("%d-%m-%Y"),
-            "day": cursor.strftime("%A"),
-            "count": daily_counts.get(cursor, 0),
-        })
-        cursor += timedelta(days=1)
+    date_from = request.args.get("from")
+    date_to = request.args.get("to")
+
+    # Default range: last 7 days (UTC)
+    try:
+        if date_to:
+            end = datetime.strptime(date_to, "%Y-%m-%d")
+        else:
+            end = datetime.utcnow()
 
-    most_active_hour = max(hourly_counts, key=hourly_counts.get) if hourly_counts else None
+        if date_from:
+            start = datetime.strptime(date_from, "%Y-%m-%d")
+        else:
+            start = end - timedelta(days=6)
+    except ValueError:
+        return {"error": "from/to must be YYYY-MM-DD"}, 400
+
+    if start > end:
+        return {"error": "from must be on or before to"}, 400
+
+    # Stage timings saved on bot replies, from the per-day rollups.
+    service = get_analytics_service()
+    summary = service.latency_summary(organisation_id, start.date(), end.date())
 
     return jsonify({
         "ok": True,
@@ -857,19 +889,7 @@ def get_chatbot_analytics():
             "to": end.strftime("%Y-%m-%d"),
             "timezone": "UTC",
         },
-        "daily_chats": daily_list,
-        "total_chats": sum(daily_counts.values()),
-        "unique_users": len(unique_users) if unique_users else len(unique_sessions),
-        "most_active_hour": {
-            "hour_24": most_active_hour,
-            "label": (
-                None if most_active_hour is None
-                else datetime.strptime(str(most_active_hour), "%H").strftime("%I %p")
-            ),
-            "count": hourly_counts.get(most_active_hour, 0)
-            if most_active_hour is not None
-            else 0,
-        },
+        **summary,
     }), 200
 
 # export chat history as CSV
@@ -1,17 +1,8 @@
 from flask import Blueprint, request, jsonify
 from backend.models import Organisation, Chatbot, AppUser
 from backend.application.ai.chatbot_service import ChatbotService
-from backend.application.ai.intent_service_embed import EmbeddingIntentService
-from backend.application.ai.template_engine import TemplateEngine
+from backend.application.ai.service_container import chatbot_services
 from backend.application.ai.speech_to_text import transcribe_audio
-from backend.application.chat_service import ChatMessageService
-from backend.data_access.ai.company_profile_repo import CompanyProfileRepository
-from backend.data_access.ai.chatbot_repo import ChatbotRepository
-from backend.data_access.ai.personality_repo import PersonalityRepository
-from backend.data_access.ai.template_repo import TemplateRepository
-from backend.data_access.ai.quick_reply_repo import QuickReplyRepository
-from backend.data_access.ChatMessages.chatMessages import ChatMessageRepository
-from backend.infrastructure.mongodb.mongo_client import get_mongo_db
 from backend import db
 
 patron_bp = Blueprint("patron", __name__)
@@ -28,26 +19,7 @@ def _require_patron():
     return user, None, None
 
 def _build_chatbot_service() -> ChatbotService:
-    company_repo = CompanyProfileRepository()
-    template_repo = TemplateRepository()
-    quick_reply_repo = QuickReplyRepository()
-    template_engine = TemplateEngine()
-    intent_service = EmbeddingIntentService()
-    chatbot_repo = ChatbotRepository()
-    personality_repo = PersonalityRepository()
-    mongo_repo = ChatMessageRepository(get_mongo_db())
-    chat_message_service = ChatMessageService(mongo_repo)
-
-    return ChatbotService(
-        intent_service=intent_service,
-        company_repository=company_repo,
-        template_repository=template_repo,
-        template_engine=template_engine,
-        chatbot_repository=chatbot_repo,
-        personality_repository=personality_repo,
-        chat_message_service=chat_message_service,
-        quick_reply_repository=quick_reply_repo,
-    )
+    return chatbot_services.chatbot_service()
 
 @patron_bp.get("/chat-directory")
 def chat_directory():
@@ -95,15 +67,15 @@ def patron_chat_welcome():
         return jsonify({"ok": False, "error": "company_id is required"}), 400
 
     try:
-        chatbot_repo = ChatbotRepository()
-        chatbot = chatbot_repo.get_by_organisation_id(company_id)
-        if not chatbot:
+        bot_config = chatbot_services.bot_config_repository.get_by_organisation_id(company_id)
+        if not bot_config:
             return jsonify({"ok": False, "error": "Chatbot not found"}), 404
 
         chatbot_service = _build_chatbot_service()
         result = chatbot_service.welcome(
             company_id=company_id,
             session_id=session_id,
+            bot_config=bot_config,
         )
         return jsonify(result), 200
     except Exception as e:
@@ -125,9 +97,8 @@ def patron_chat():
         return jsonify({"ok": False, "error": "company_id and message are required"}), 400
 
     try:
-        chatbot_repo = ChatbotRepository()
-        chatbot = chatbot_repo.get_by_organisation_id(company_id)
-        if not chatbot:
+        bot_config = chatbot_services.bot_config_repository.get_by_organisation_id(company_id)
+        if not bot_config:
             return jsonify({"ok": False, "error": "Chatbot not found"}), 404
 
         chatbot_service = _build_chatbot_service()
@@ -136,6 +107,7 @@ def patron_chat():
             message=message,
             session_id=session_id,
             user_id=user.user_id,
+            bot_config=bot_config,
         )
         return jsonify(result), 200
     except Exception as e:
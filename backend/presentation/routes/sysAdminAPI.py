@@ -9,6 +9,9 @@ from backend.data_access.Notifications.notifications import NotificationReposito
 from backend.data_access.Users.users import UserRepository
 from backend.application.user_profile_service import UserProfileService
 from backend.infrastructure.mongodb.mongo_client import get_mongo_db
+from backend.data_access.ChatMessages.chatRollups import ChatRollupRepository
+from backend.application.analytics_service import get_analytics_service
+from backend.infrastructure.sketches.hyperloglog import relative_error
 
 
 sysadmin_bp = Blueprint("sysadmin", __name__)
@@ -1264,31 +1267,49 @@ def dashboard_daily_usage():
             },
             {"$sort": {"_id": 1}}
         ]
+
+        rows = list(collection.aggregate(pipeline))
+        counts_by_date = {r["_id"]: r["count"] for r in rows}
+        error = 0.0
     else:  # sessions
-        pipeline = [
-            match_stage,
-            {"$match": {"sessionId": {"$ne": None}}},
-            {
-                "$group": {
-                    "_id": {
-                        "$dateToString": {
-                            "format": "%Y-%m-%d",
-                            "date": "$timestamp"
-                        }
-                    },
-                    "sessions": {"$addToSet": "$sessionId"}
-                }
-            },
-            {
-                "$project": {
-                    "count": {"$size": "$sessions"}
+        # Distinct sessions per day from the HyperLogLog sketches in the
+        # analytics rollups, instead of collecting every session id in Mongo.
+        # Days the rollups do not cover yet (history before the backfill) are
+        # counted exactly from chatMessages.
+        rollups_from = get_analytics_service().rollups_from()
+        counts_by_date = {}
+        error = 0.0
+
+        if rollups_from is None or start_dt.date() < rollups_from:
+            exact_match = {"timestamp": {"$gte": start_dt}, "sessionId": {"$ne": None}}
+            if rollups_from is not None:
+                exact_match["timestamp"]["$lt"] = datetime.combine(rollups_from, datetime.min.time(), tzinfo=timezone.utc)
+            pipeline = [
+                {"$match": exact_match},
+                {
+                    "$group": {
+                        "_id": {
+                            "$dateToString": {
+                                "format": "%Y-%m-%d",
+                                "date": "$timestamp"
+                            }
+                        },
+                        "sessions": {"$addToSet": "$sessionId"}
+                    }
+                },
+                {
+                    "$project": {
+                        "count": {"$size": "$sessions"}
+                    }
                 }
-            },
-            {"$sort": {"_id": 1}}
-        ]
+            ]
+            counts_by_date.update({r["_id"]: r["count"] for r in collection.aggregate(pipeline)})
 
-    rows = list(collection.aggregate(pipeline))
-    counts_by_date = {r["_id"]: r["count"] for r in rows}
+        if rollups_from is not None and rollups_from <= end_dt.date():
+            sketch_from = max(start_dt.date(), rollups_from)
+            sketches = ChatRollupRepository(dbm).session_sketches_by_day(sketch_from, end_dt.date())
+            counts_by_date.update({day: sketch.count() for day, sketch in sketches.items()})
+            error = relative_error()
 
     series = []
     for i in range(days):
@@ -1302,6 +1323,8 @@ def dashboard_daily_usage():
     return jsonify({
         "ok": True,
         "metric": metric,
+        # Relative standard error of each count (0 for exact counts).
+        "relative_error": round(error, 4),
         "series": series
     }), 200
 
@@ -0,0 +1,63 @@
+# Query-plan checks for the registered MongoDB query shapes.
+#
+# The plan tests need a MongoDB server; point MONGO_TEST_URI at one (a
+# scratch database is created and dropped), otherwise they are skipped:
+#
+#   MONGO_TEST_URI=mongodb://localhost:27017 python -m pytest tests/test_index_plans.py
+
+import os
+
+import pytest
+
+from backend.infrastructure.mongodb.indexes import INDEXES, check_plan, plan_stages, query_shapes, seed_scratch
+
+SHAPES = query_shapes()
+
+
+def _ixscan(index_name):
+    return {"queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": index_name}}}}
+
+
+@pytest.mark.parametrize("name, collection, allowed_indexes", [shape[:3] for shape in SHAPES], ids=[shape[0] for shape in SHAPES])
+def test_shape_declares_registered_indexes(name, collection, allowed_indexes):
+    declared = {model.document["name"] for model in INDEXES[collection]}
+    assert set(allowed_indexes) <= declared
+
+
+def test_check_plan_accepts_declared_index_scan():
+    assert check_plan(_ixscan("org_ts_id"), ("org_ts_id",)) is None
+
+
+def test_check_plan_rejects_collection_scan():
+    assert check_plan({"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}, ("ts",)) == "collection scan"
+
+
+def test_check_plan_rejects_undeclared_index():
+    assert "expected org_ts_id" in check_plan(_ixscan("ts"), ("org_ts_id",))
+
+
+def test_check_plan_ignores_rejected_plans():
+    explain = _ixscan("ts")
+    explain["queryPlanner"]["rejectedPlans"] = [{"stage": "COLLSCAN"}]
+    assert check_plan(explain, ("ts",)) is None
+
+
+@pytest.fixture(scope="module")
+def scratch_db():
+    uri = os.getenv("MONGO_TEST_URI")
+    if not uri:
+        pytest.skip("MONGO_TEST_URI is not set")
+    from pymongo import MongoClient
+
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    db = client["botforge_index_plan_test"]
+    seed_scratch(db)
+    yield db
+    client.drop_database(db.name)
+    client.close()
+
+
+@pytest.mark.parametrize("name, collection, allowed_indexes, explain", SHAPES, ids=[shape[0] for shape in SHAPES])
+def test_query_plan_uses_declared_index(scratch_db, name, collection, allowed_indexes, explain):
+    plan = explain(scratch_db[collection])
+    assert check_plan(plan, allowed_indexes) is None, " <- ".join(plan_stages(plan))